@@ -0,0 +1,351 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List
+
+from dotenv import load_dotenv
+
+from config import AREAS, INDUSTRIES
+from database_manager import DatabaseManager
+from reference_data import load_reference_snapshot
+from salary_analytics import SalaryAnalytics
+from vacancy_record import VacancyRecord
+
+# Курсы валют для синтетических вакансий (как в справочнике hh.ru: единиц валюты за рубль)
+CURRENCIES = {'RUR': 1.0, 'USD': 0.0105, 'EUR': 0.0097, 'KZT': 4.8}
+# Среднее количество вакансий на одного работодателя
+VACANCIES_PER_EMPLOYER = 20
+# Количество вакансий, загружаемых одним вызовом fill_vacancies
+BATCH_SIZE = 50_000
+# Таблицы, очищаемые перед замерами: все, что ссылается на employers, должно быть в списке
+DATA_TABLES = ('vacancies', 'vacancy_history', 'employer_industry', 'tracked_employers', 'employers',
+               'employer_directory', 'load_quarantine', 'salary_rollup', 'salary_rollup_dirty')
+# ID крупнейших городов, на которые приходится большая часть вакансий
+MAJOR_CITY_IDS = (1, 2)
+
+TITLE_ROLES = ('Разработчик', 'Аналитик', 'Менеджер', 'Инженер', 'Бухгалтер', 'Продавец-консультант',
+               'Водитель', 'Оператор', 'Специалист', 'Кладовщик', 'Тестировщик', 'Дизайнер')
+TITLE_LEVELS = ('', 'Младший ', 'Старший ', 'Ведущий ', 'Главный ')
+TITLE_AREAS = ('', ' Python', ' Java', ' по продажам', ' 1С', ' по работе с клиентами', ' данных', ' склада')
+COMPANY_WORDS = ('Альфа', 'Север', 'Технологии', 'Групп', 'Сервис', 'Логистик', 'Пром', 'Софт', 'Торг', 'Строй')
+
+
+class SyntheticDataGenerator:
+    """
+    Генератор синтетических работодателей и вакансий с ID городов и отраслей из areas.json и industries.json.
+    Распределения приближены к реальным: большая часть вакансий в Москве и Санкт-Петербурге,
+    зарплаты распределены логнормально, часть зарплат указана в иностранной валюте и до вычета налога.
+    """
+
+    def __init__(self, snapshot: Dict[str, Any], seed: int = 0):
+        """
+        Конструктор класса.
+
+        Args:
+            snapshot (Dict[str, Any]): Снимок справочных данных (см. reference_data.load_reference_snapshot).
+            seed (int, optional): Начальное значение генератора случайных чисел. По умолчанию 0.
+        """
+        self.random = random.Random(seed)
+        self.city_names = {city_id: name for city_id, name, _ in snapshot['cities']}
+        self.city_ids = list(self.city_names)
+        self.industries = [(industry_id, name) for industry_id, name in snapshot['industries']]
+        self.next_vacancy_id = 1
+
+    def _city_id(self) -> int:
+        if self.random.random() < 0.45:
+            return self.random.choice(MAJOR_CITY_IDS)
+        return self.random.choice(self.city_ids)
+
+    def employers(self, first_id: int, count: int) -> List[Dict[str, Any]]:
+        """
+        Генерирует работодателей в формате ответа /employers/{id}.
+
+        Args:
+            first_id (int): ID первого работодателя.
+            count (int): Количество работодателей.
+
+        Returns:
+            List[Dict[str, Any]]: Список словарей с информацией о работодателях.
+        """
+        employers = []
+        for employer_id in range(first_id, first_id + count):
+            name = ' '.join(self.random.sample(COMPANY_WORDS, 2)) + f' {employer_id}'
+            city_id = self._city_id()
+            industries = self.random.sample(self.industries, self.random.choice((0, 1, 1, 2)))
+            employers.append({
+                'id': str(employer_id),
+                'name': name,
+                'accredited_it_employer': self.random.random() < 0.1,
+                'alternate_url': f'https://hh.ru/employer/{employer_id}',
+                'area': {'id': str(city_id), 'name': self.city_names[city_id]},
+                'industries': [{'id': industry_id, 'name': industry_name} for industry_id, industry_name in industries],
+            })
+        return employers
+
+    def vacancies(self, count: int, employer_ids: List[int]) -> Iterator[VacancyRecord]:
+        """
+        Генерирует записи о вакансиях работодателей.
+
+        Args:
+            count (int): Количество вакансий.
+            employer_ids (List[int]): ID работодателей, которым принадлежат вакансии.
+
+        Returns:
+            Iterator[VacancyRecord]: Записи о вакансиях.
+        """
+        now = datetime.now()
+        for _ in range(count):
+            vacancy_id = self.next_vacancy_id
+            self.next_vacancy_id += 1
+            currency = 'RUR' if self.random.random() < 0.95 else self.random.choice(('USD', 'EUR', 'KZT'))
+            salary = round(self.random.lognormvariate(11.1, 0.5), -3) * CURRENCIES[currency]
+            salary_from, salary_to = (salary, None) if self.random.random() < 0.7 else (None, salary)
+            title = (self.random.choice(TITLE_LEVELS) + self.random.choice(TITLE_ROLES)
+                     + self.random.choice(TITLE_AREAS))
+            published_at = now - timedelta(days=self.random.uniform(0, 365))
+            yield VacancyRecord(vacancy_id, title, self._city_id(), salary_from, salary_to, currency,
+                                self.random.random() < 0.3, published_at.strftime('%Y-%m-%dT%H:%M:%S+0300'),
+                                False, None, self.random.choice(employer_ids), None,
+                                f'https://hh.ru/vacancy/{vacancy_id}')
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Вычисляет перцентиль методом ближайшего ранга.
+
+    Args:
+        values (List[float]): Значения.
+        fraction (float): Доля от 0 до 1.
+
+    Returns:
+        float: Значение перцентиля.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(method: Callable[[], Any], repeats: int) -> Dict[str, float]:
+    """
+    Измеряет задержку вызова метода.
+
+    Args:
+        method (Callable[[], Any]): Вызываемый метод.
+        repeats (int): Количество повторов.
+
+    Returns:
+        Dict[str, float]: Медиана и 95-й перцентиль задержки в миллисекундах и количество повторов.
+    """
+    timings = []
+    for _ in range(repeats):
+        started = perf_counter()
+        method()
+        timings.append((perf_counter() - started) * 1000)
+    return {'p50_ms': round(percentile(timings, 0.5), 2), 'p95_ms': round(percentile(timings, 0.95), 2),
+            'runs': repeats}
+
+
+def check_load(description: str, expected: int, loaded: int, log: io.StringIO) -> None:
+    """
+    Прерывает замеры, если загружены не все строки: иначе скорость загрузки считалась бы по строкам,
+    которые на самом деле отклонены или не записаны из-за ошибки.
+
+    Args:
+        description (str): Что загружалось.
+        expected (int): Ожидаемое количество строк.
+        loaded (int): Количество загруженных строк.
+        log (io.StringIO): Перехваченный вывод методов загрузки.
+
+    Returns:
+        None
+    """
+    if loaded != expected:
+        errors = [line for line in log.getvalue().splitlines() if 'Ошибка' in line or 'load_quarantine' in line]
+        raise RuntimeError(f"{description}: загружено {loaded} из {expected}. {' '.join(errors[-3:])}")
+
+
+def run_benchmark(db_manager: DatabaseManager, scales: List[int], repeats: int,
+                  batch_size: int = BATCH_SIZE, seed: int = 0) -> Dict[str, Any]:
+    """
+    Последовательно наполняет базу данных синтетическими вакансиями до каждого из указанных объемов
+    и на каждом объеме измеряет скорость загрузки и задержку методов чтения DatabaseManager.
+
+    Args:
+        db_manager (DatabaseManager): Менеджер отдельной базы данных для замеров.
+        scales (List[int]): Объемы таблицы vacancies по возрастанию.
+        repeats (int): Количество повторов каждого метода чтения.
+        batch_size (int, optional): Количество вакансий в одном вызове fill_vacancies. По умолчанию BATCH_SIZE.
+        seed (int, optional): Начальное значение генератора случайных чисел. По умолчанию 0.
+
+    Returns:
+        Dict[str, Any]: Результаты замеров.
+    """
+    snapshot = load_reference_snapshot(AREAS, INDUSTRIES)
+    generator = SyntheticDataGenerator(snapshot, seed)
+    analytics = SalaryAnalytics(db_manager)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db_manager.create_database()
+        schema_created = db_manager.create_tables()
+        db_manager.load_reference_data(snapshot)
+    if not schema_created:
+        raise RuntimeError("Не удалось создать таблицы в базе данных для замеров.")
+    # Замеры всегда начинаются с пустых таблиц работодателей и вакансий. Запрос выполняется напрямую,
+    # чтобы ошибка прервала замеры, а не привела к загрузке поверх данных прошлого запуска
+    with db_manager._get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"TRUNCATE {', '.join(DATA_TABLES)}")
+    conn.commit()
+
+    sample_ids = []
+
+    def check_employer_exists():
+        # Метод сообщает о найденном работодателе, этот вывод в замерах не нужен
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_manager.check_employer_exists_by_id(sample_ids[0])
+
+    read_methods = {
+        'get_companies_and_vacancies_count': db_manager.get_companies_and_vacancies_count,
+        'get_all_vacancies': db_manager.get_all_vacancies,
+        'get_avg_salary': db_manager.get_avg_salary,
+        'get_vacancies_with_higher_salary': db_manager.get_vacancies_with_higher_salary,
+        'get_vacancies_with_keyword': lambda: db_manager.get_vacancies_with_keyword('разработчик'),
+        'search_employer_directory': lambda: db_manager.search_employer_directory('альфа север'),
+        'salary_distribution_by_region': lambda: analytics.get_distribution('region_id'),
+        'salary_distribution_by_industry': lambda: analytics.get_distribution('industry_id'),
+        'check_employer_exists_by_id': check_employer_exists,
+        'get_existing_employer_ids': lambda: db_manager.get_existing_employer_ids(sample_ids),
+        'get_due_tracked_employers': db_manager.get_due_tracked_employers,
+    }
+    results = {'started_at': datetime.now().isoformat(timespec='seconds'), 'repeats': repeats, 'scales': []}
+    employer_count = 0
+    vacancy_count = 0
+    for scale in scales:
+        new_vacancies = scale - vacancy_count
+        if new_vacancies <= 0:
+            continue
+        new_employers = max(1, new_vacancies // VACANCIES_PER_EMPLOYER)
+        employers = generator.employers(employer_count + 1, new_employers)
+        employer_ids = [int(employer['id']) for employer in employers]
+
+        # Вывод методов загрузки перехватывается, а ошибки из него показываются при проверке результата
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            started = perf_counter()
+            db_manager.fill_employers_from_info(employers)
+            employers_seconds = perf_counter() - started
+        check_load("Работодатели", len(employers), len(db_manager.get_existing_employer_ids(employer_ids)), log)
+
+        with contextlib.redirect_stdout(log):
+            started = perf_counter()
+            db_manager.upsert_employer_directory(employers)
+            directory_seconds = perf_counter() - started
+            db_manager.track_employers(employer_ids)
+
+            vacancies = generator.vacancies(new_vacancies, employer_ids)
+            totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+            started = perf_counter()
+            remaining = new_vacancies
+            while remaining > 0:
+                batch = list(islice(vacancies, min(batch_size, remaining)))
+                stats = db_manager.fill_vacancies(batch, CURRENCIES)
+                for key in totals:
+                    totals[key] += stats[key]
+                remaining -= len(batch)
+            vacancies_seconds = perf_counter() - started
+        check_load("Вакансии", new_vacancies, totals['inserted'], log)
+
+        with contextlib.redirect_stdout(log):
+            started = perf_counter()
+            analytics.refresh_rollups(employer_ids)
+            rollup_seconds = perf_counter() - started
+
+        employer_count += len(employers)
+        sample_ids[:] = employer_ids[:100]
+        inserted = totals['inserted']
+        vacancy_count = scale
+        scale_result = {
+            'vacancies': vacancy_count,
+            'employers': employer_count,
+            'insert': {
+                'employers_rows_per_sec': round(len(employers) / employers_seconds, 1),
+                'directory_rows_per_sec': round(len(employers) / directory_seconds, 1),
+                'vacancies_rows': inserted,
+                'vacancies_updated': totals['updated'],
+                'vacancies_rejected': totals['rejected'],
+                'vacancies_seconds': round(vacancies_seconds, 3),
+                'vacancies_rows_per_sec': round(inserted / vacancies_seconds, 1),
+            },
+            'rollup_refresh_seconds': round(rollup_seconds, 3),
+            'reads': {},
+        }
+        for name, method in read_methods.items():
+            scale_result['reads'][name] = measure(method, repeats)
+        results['scales'].append(scale_result)
+        print(f"{vacancy_count} вакансий: загрузка {scale_result['insert']['vacancies_rows_per_sec']} строк/с, "
+              f"пересчет агрегатов {scale_result['rollup_refresh_seconds']} с")
+        for name, timing in scale_result['reads'].items():
+            print(f"    {name}: p50 {timing['p50_ms']} мс, p95 {timing['p95_ms']} мс")
+    return results
+
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """
+    Выводит изменение показателей относительно предыдущего запуска для совпадающих объемов.
+
+    Args:
+        results (Dict[str, Any]): Результаты текущего запуска.
+        baseline (Dict[str, Any]): Результаты предыдущего запуска.
+
+    Returns:
+        None
+    """
+    baseline_scales = {scale['vacancies']: scale for scale in baseline['scales']}
+    for scale in results['scales']:
+        previous = baseline_scales.get(scale['vacancies'])
+        if not previous:
+            continue
+        print(f"Сравнение с базовым запуском, {scale['vacancies']} вакансий:")
+        current_rate = scale['insert']['vacancies_rows_per_sec']
+        previous_rate = previous['insert']['vacancies_rows_per_sec']
+        print(f"    загрузка: {current_rate / previous_rate - 1:+.1%}")
+        for name, timing in scale['reads'].items():
+            if name in previous['reads']:
+                print(f"    {name} p95: {timing['p95_ms'] / previous['reads'][name]['p95_ms'] - 1:+.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры скорости загрузки и чтения данных DatabaseManager "
+                                                 "на синтетических данных.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="объемы таблицы vacancies")
+    parser.add_argument('--repeats', type=int, default=5, help="количество повторов каждого метода чтения")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="вакансий в одном вызове fill_vacancies")
+    parser.add_argument('--seed', type=int, default=0, help="начальное значение генератора случайных чисел")
+    parser.add_argument('--output', default='benchmark_results.json', help="файл для сохранения результатов")
+    parser.add_argument('--baseline', help="файл с результатами предыдущего запуска для сравнения")
+    args = parser.parse_args()
+
+    load_dotenv()
+    bench_db_name = os.getenv('BENCH_DB_NAME', 'hh_benchmark')
+    if bench_db_name == os.getenv('DB_NAME'):
+        print("BENCH_DB_NAME должна отличаться от рабочей базы данных DB_NAME.")
+        return
+    db_manager = DatabaseManager(os.getenv('DB_HOST'), bench_db_name, os.getenv('DB_USER'), os.getenv('DB_PASSWORD'))
+
+    results = run_benchmark(db_manager, sorted(args.scales), args.repeats, args.batch_size, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в файл {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+            compare_results(results, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+from database_manager import DatabaseManager, SCHEMA_VERSION
+from http_transport import HttpTransport
+from reference_data import load_reference_snapshot, region_names
+
+
+class Bootstrap:
+    """
+    Подготовка базы данных и справочных данных при запуске программы.
+    Шаги, уже выполненные ранее, пропускаются по служебным отметкам в таблице 'schema_meta',
+    а независимые шаги (загрузка справочников, группировка регионов, курсы валют, агрегаты зарплат)
+    выполняются параллельно в фоне. Результаты запрашиваются только в момент, когда они действительно нужны.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, transport: HttpTransport, areas_path: str,
+                 industries_path: str, max_population: int, user_agent: str):
+        """
+        Конструктор класса.
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных.
+            transport (HttpTransport): Общий HTTP-транспорт.
+            areas_path (str): Путь к JSON-файлу с деревом регионов.
+            industries_path (str): Путь к JSON-файлу с отраслями.
+            max_population (int): Предельное население группы регионов.
+            user_agent (str): Заголовок User-Agent для запросов к API.
+        """
+        self.db_manager = db_manager
+        self.transport = transport
+        self.areas_path = areas_path
+        self.industries_path = industries_path
+        self.max_population = max_population
+        self.user_agent = user_agent
+        self.snapshot = None
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='bootstrap')
+        self._reference_future: Future = None
+        self._areas_future: Future = None
+        self._currencies_future: Future = None
+        self._analytics_future: Future = None
+
+    def start(self) -> None:
+        """
+        Создает схему базы данных, если ее версия устарела, и запускает остальные шаги подготовки в фоне.
+        Если схему создать не удалось, работа прерывается: загрузка в неполную схему завершилась бы ошибками.
+
+        Returns:
+            None
+        """
+        if self.db_manager.get_meta('schema_version') != SCHEMA_VERSION:
+            self.db_manager.create_database()
+            # Отметку версии ставим только после успешного создания схемы, иначе при следующем запуске
+            # обновление схемы будет повторено
+            if not self.db_manager.create_tables():
+                raise RuntimeError("Не удалось создать или обновить схему базы данных.")
+            self.db_manager.set_meta('schema_version', SCHEMA_VERSION)
+
+        self.snapshot = load_reference_snapshot(self.areas_path, self.industries_path)
+        self._reference_future = self._executor.submit(self._load_reference_data)
+        self._areas_future = self._executor.submit(self._load_region_groups)
+        self._currencies_future = self._executor.submit(self._load_currencies)
+        self._analytics_future = self._executor.submit(self._prepare_analytics)
+        self._executor.shutdown(wait=False)
+
+    def _load_reference_data(self) -> None:
+        """
+        Загружает регионы, города и отрасли, если отметка версии справочных данных не совпадает со снимком.
+        """
+        if self.db_manager.get_meta('reference_data_version') == self.snapshot['source_key']:
+            return
+        if self.db_manager.load_reference_data(self.snapshot):
+            self.db_manager.set_meta('reference_data_version', self.snapshot['source_key'])
+
+    def _load_region_groups(self) -> List[List[int]]:
+        """
+        Получает сгруппированные по населению регионы России. Результат сохраняется в 'schema_meta'
+        и при следующих запусках с тем же MAX_POPULATION берется из базы без обращения к Википедии.
+        """
+        cached = self.db_manager.get_meta('region_groups')
+        if cached:
+            cached = json.loads(cached)
+            if cached['max_population'] == self.max_population:
+                return cached['groups']
+
+        from utils import get_regions_by_group
+
+        groups = get_regions_by_group(self.max_population, region_names(self.snapshot), self.transport)
+        self.db_manager.set_meta('region_groups', json.dumps({'max_population': self.max_population,
+                                                              'groups': groups}))
+        return groups
+
+    def _load_currencies(self) -> Dict[str, float]:
+        """
+        Получает актуальные курсы валют.
+        """
+        from utils import fetch_currency_data
+
+        return fetch_currency_data(self.user_agent, self.transport)
+
+    def _prepare_analytics(self) -> None:
+        """
+        Строит агрегаты зарплат, если вакансии уже есть, а агрегатов еще нет.
+        """
+        from salary_analytics import SalaryAnalytics
+
+        if self.db_manager.check_table_has_data('vacancies') and \
+                not self.db_manager.check_table_has_data('salary_rollup'):
+            SalaryAnalytics(self.db_manager).refresh_rollups()
+
+    def wait_reference_data(self) -> None:
+        """
+        Ожидает завершения загрузки регионов, городов и отраслей.
+
+        Returns:
+            None
+        """
+        self._reference_future.result()
+
+    @property
+    def areas_data(self) -> List[List[int]]:
+        """
+        Сгруппированные по населению регионы России (ожидает завершения фонового шага).
+        """
+        return self._areas_future.result()
+
+    @property
+    def currencies(self) -> Dict[str, float]:
+        """
+        Курсы валют (ожидает завершения фонового шага).
+        """
+        return self._currencies_future.result()
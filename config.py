@@ -0,0 +1,6 @@
+# Общие настройки приложения, планировщика обновлений и замеров производительности
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
+# Файлы справочников регионов и отраслей hh.ru
+AREAS = 'areas.json'
+INDUSTRIES = 'industries.json'
+MAX_POPULATION = 8_000_000  #Для группировки регионов России по населению
@@ -1,8 +1,42 @@
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, Optional
+import csv
+import io
 import json
 import psycopg2
 from psycopg2 import sql
-from psycopg2.extras import DictCursor
+from psycopg2.extras import DictCursor, execute_values
+from utils import normalize_company_name
+from vacancy_record import VacancyRecord
+
+# Версия схемы базы данных. Увеличивается при каждом изменении create_tables
+SCHEMA_VERSION = '6'
+# Через сколько дней сведения о работодателе в локальном справочнике считаются устаревшими
+DIRECTORY_STALE_DAYS = 7
+# Расширение и индекс для нечеткого поиска по названию. Создаются отдельно от схемы: без них поиск
+# в справочнике работодателей работает по подстроке
+TRIGRAM_INDEX_QUERY = """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS employer_directory_name_trgm_idx
+        ON employer_directory USING GIN (name_normalized gin_trgm_ops);
+"""
+# Столбцы строк, загружаемых в таблицы, и столбцы ключа строки. По ним отклоненные строки сохраняются
+# в таблицу 'load_quarantine' словарем, а повторно отклоненные строки не дублируются
+QUARANTINE_COLUMNS = {
+    'employers': ('employer_id', 'company_name', 'accredited_it_employer', 'employer_url', 'city_id'),
+    'employer_industry': ('employer_id', 'industry_id'),
+    'vacancies': ('vacancy_id', 'vacancy_title', 'city_id', 'salary', 'published_at', 'archived', 'address',
+                  'employer_id', 'vacancy_url', 'content_hash'),
+}
+QUARANTINE_KEYS = {
+    'employers': ('employer_id',),
+    'employer_industry': ('employer_id', 'industry_id'),
+    'vacancies': ('vacancy_id',),
+}
+# Запросы для получения допустимых значений внешних ключей при проверке загружаемых строк
+REFERENCE_ID_QUERIES = {
+    'cities': "SELECT city_id FROM cities",
+    'industries': "SELECT id_industry::text FROM industries",
+}
 
 
 class DatabaseManager:
@@ -20,6 +54,8 @@ class DatabaseManager:
         self.db_name = db_name
         self.db_user = db_user
         self.db_password = db_password
+        self._reference_ids = {}
+        self._trigram_available = None
 
     def _get_connection(self) -> psycopg2.extensions.connection:
         """
@@ -53,6 +89,85 @@ class DatabaseManager:
         except psycopg2.Error as e:
             print("Ошибка при выполнении запроса:", e)
 
+    def _get_reference_ids(self, cursor, table_name: str) -> set:
+        """
+        Получает множество ID справочной таблицы ('cities' или 'industries') для проверки внешних ключей.
+        Справочники не меняются во время работы программы, поэтому результат кэшируется.
+
+        Args:
+            cursor: Курсор открытого соединения.
+            table_name (str): Название справочной таблицы.
+
+        Returns:
+            set: Множество ID.
+        """
+        if not self._reference_ids.get(table_name):
+            cursor.execute(REFERENCE_ID_QUERIES[table_name])
+            self._reference_ids[table_name] = {row[0] for row in cursor.fetchall()}
+        return self._reference_ids[table_name]
+
+    def _execute_values_isolated(self, cursor, query: str, rows: List[tuple],
+                                 template: Optional[str] = None) -> List[Tuple[tuple, str]]:
+        """
+        Выполняет пакетный запрос (execute_values) внутри точки сохранения. Если пакет не удалось записать,
+        он делится пополам и каждая половина записывается отдельно, пока ошибочные строки не будут найдены
+        по одной. Остальные строки записываются в той же транзакции.
+
+        Args:
+            cursor: Курсор открытого соединения.
+            query (str): SQL-запрос с одним местом подстановки VALUES %s.
+            rows (List[tuple]): Строки данных.
+            template (Optional[str]): Шаблон строки для execute_values.
+
+        Returns:
+            List[Tuple[tuple, str]]: Отклоненные строки и причины ошибок.
+        """
+        if not rows:
+            return []
+        cursor.execute("SAVEPOINT bulk_load")
+        try:
+            execute_values(cursor, query, rows, template=template, page_size=len(rows))
+            cursor.execute("RELEASE SAVEPOINT bulk_load")
+            return []
+        except psycopg2.Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_load")
+            cursor.execute("RELEASE SAVEPOINT bulk_load")
+            if len(rows) == 1:
+                return [(rows[0], str(e).strip())]
+        middle = len(rows) // 2
+        return (self._execute_values_isolated(cursor, query, rows[:middle], template)
+                + self._execute_values_isolated(cursor, query, rows[middle:], template))
+
+    @staticmethod
+    def _quarantine(cursor, table_name: str, rejected: List[Tuple[tuple, str]]) -> None:
+        """
+        Сохраняет отклоненные строки вместе с причиной в таблицу 'load_quarantine'. Строка сохраняется
+        словарем с названиями столбцов из QUARANTINE_COLUMNS. Если строка с тем же ключом уже отклонялась
+        по той же причине, обновляются ее данные и время последнего отклонения.
+
+        Args:
+            cursor: Курсор открытого соединения.
+            table_name (str): Таблица, в которую не удалось записать строки.
+            rejected (List[Tuple[tuple, str]]): Отклоненные строки и причины.
+
+        Returns:
+            None
+        """
+        if rejected:
+            columns = QUARANTINE_COLUMNS[table_name]
+            quarantine_rows = {}
+            for row, reason in rejected:
+                row_data = dict(zip(columns, row))
+                row_key = ':'.join(str(row_data[column]) for column in QUARANTINE_KEYS[table_name])
+                quarantine_rows[(row_key, reason)] = (table_name, row_key,
+                                                      json.dumps(row_data, ensure_ascii=False, default=str), reason)
+            execute_values(cursor, """
+                INSERT INTO load_quarantine (table_name, row_key, row_data, reason) VALUES %s
+                ON CONFLICT (table_name, row_key, reason) DO UPDATE
+                SET row_data = EXCLUDED.row_data, last_seen_at = NOW()
+            """, list(quarantine_rows.values()))
+            print(f"{len(rejected)} строк для таблицы {table_name} не загружены и сохранены в load_quarantine.")
+
     def create_database(self) -> None:
         """
         Создает базу данных.
@@ -72,14 +187,20 @@ class DatabaseManager:
             if conn:
                 conn.close()
 
-    def create_tables(self) -> None:
+    def create_tables(self) -> bool:
         """
-        Создает таблицы в базе данных, если они не существуют.
+        Создает таблицы в базе данных, если они не существуют. Все изменения схемы выполняются
+        в одной транзакции.
 
         Returns:
-            None
+            bool: True, если схема создана или обновлена, иначе False.
         """
         create_table_query = """
+            CREATE TABLE IF NOT EXISTS schema_meta (
+                key VARCHAR(64) PRIMARY KEY,
+                value TEXT
+            );
+
             CREATE TABLE IF NOT EXISTS regions (
                 region_id SERIAL PRIMARY KEY,
                 region_name VARCHAR(255) UNIQUE
@@ -126,126 +247,208 @@ class DatabaseManager:
                 FOREIGN KEY (city_id) REFERENCES cities(city_id),
                 FOREIGN KEY (employer_id) REFERENCES employers(employer_id)
             );
+
+            CREATE TABLE IF NOT EXISTS employer_directory (
+                employer_id INT PRIMARY KEY,
+                company_name VARCHAR(255),
+                name_normalized VARCHAR(255),
+                city_name VARCHAR(255),
+                industries TEXT,
+                open_vacancies INT,
+                employer_url VARCHAR(255),
+                updated_at TIMESTAMP DEFAULT NOW(),
+                details_updated_at TIMESTAMP
+            );
+
+            ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS content_hash CHAR(32);
+
+            CREATE TABLE IF NOT EXISTS vacancy_history (
+                vacancy_id INT,
+                recorded_at TIMESTAMP DEFAULT NOW(),
+                vacancy_title VARCHAR(255),
+                salary INT,
+                archived BOOLEAN,
+                PRIMARY KEY (vacancy_id, recorded_at)
+            );
+
+            CREATE TABLE IF NOT EXISTS load_quarantine (
+                quarantine_id SERIAL PRIMARY KEY,
+                table_name VARCHAR(64),
+                row_data TEXT,
+                reason TEXT,
+                created_at TIMESTAMP DEFAULT NOW()
+            );
+            ALTER TABLE load_quarantine ADD COLUMN IF NOT EXISTS row_key TEXT;
+            ALTER TABLE load_quarantine ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP DEFAULT NOW();
+            CREATE UNIQUE INDEX IF NOT EXISTS load_quarantine_row_idx
+                ON load_quarantine (table_name, row_key, reason);
+
+            CREATE TABLE IF NOT EXISTS tracked_employers (
+                employer_id INT PRIMARY KEY,
+                open_vacancies INT DEFAULT 0,
+                churn_rate REAL DEFAULT 0,
+                last_refreshed_at TIMESTAMP,
+                next_refresh_at TIMESTAMP DEFAULT NOW(),
+                FOREIGN KEY (employer_id) REFERENCES employers(employer_id)
+            );
+            CREATE INDEX IF NOT EXISTS tracked_employers_next_refresh_idx
+                ON tracked_employers (next_refresh_at);
+
+            CREATE TABLE IF NOT EXISTS salary_rollup (
+                region_id INT,
+                industry_id DECIMAL(6, 3),
+                month DATE,
+                bucket SMALLINT,
+                vacancy_count INT,
+                salary_sum BIGINT,
+                PRIMARY KEY (region_id, industry_id, month, bucket)
+            );
+
+            CREATE TABLE IF NOT EXISTS salary_rollup_dirty (
+                region_id INT,
+                month DATE,
+                PRIMARY KEY (region_id, month)
+            );
             """
-        self._execute_query(create_table_query)
+        try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(create_table_query)
+            conn.commit()
+        except psycopg2.Error as e:
+            print("Ошибка при создании таблиц:", e)
+            return False
         print("Таблицы успешно созданы.")
+        self._create_trigram_index()
+        return True
 
-    def check_table_has_data(self, table_name: str) -> bool:
+    def _create_trigram_index(self) -> None:
         """
-        Проверяет наличие записей в указанной таблице.
-
-        Args:
-            table_name (str): Название таблицы для проверки.
+        Создает расширение pg_trgm и триграммный индекс справочника работодателей. Если расширение
+        недоступно на сервере или у пользователя нет прав на его создание, поиск работает по подстроке.
 
         Returns:
-            bool: True, если таблица содержит записи, иначе False.
+            None
         """
-        query = sql.SQL(f"SELECT COUNT(*) FROM {table_name}")
         try:
             with self._get_connection() as conn, conn.cursor() as cursor:
-                cursor.execute(query)
-                count = cursor.fetchone()[0]
-            return count > 0
+                cursor.execute(TRIGRAM_INDEX_QUERY)
+            conn.commit()
         except psycopg2.Error as e:
-            print(f"Ошибка при проверке наличия записей в таблице {table_name}:", e)
-            return False
+            print("Расширение pg_trgm недоступно, поиск работодателей будет выполняться по подстроке:", e)
+        self._trigram_available = None
 
-    def fill_regions_from_json(self, json_file_path: str) -> None:
+    def _has_trigram(self, cursor) -> bool:
         """
-        Заполняет таблицу 'regions' данными из JSON-файла.
+        Проверяет, установлено ли в базе данных расширение pg_trgm. Результат запоминается.
 
         Args:
-            json_file_path (str): Путь к JSON-файлу с данными о регионах.
+            cursor: Курсор открытого соединения.
 
         Returns:
-            None
+            bool: True, если расширение установлено.
         """
-        if self.check_table_has_data('regions'):
-            print("Таблица regions уже заполнена.")
-            return
-        with open(json_file_path, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-
-        regions_data = [(int(region['id']), region['name']) for region in data['areas']]
-        # Добавляем регион "Россия" с id = 113
-        regions_data.append((113, 'Россия'))
-        query = sql.SQL("INSERT INTO regions (region_id, region_name) VALUES (%s, %s)")
-        self._execute_query(query, regions_data)
-        print("Данные о регионах успешно добавлены в таблицу regions.")
+        if self._trigram_available is None:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+            self._trigram_available = cursor.fetchone()[0]
+        return self._trigram_available
 
-    def fill_cities_from_json(self, json_file_path: str) -> None:
+    def get_meta(self, key: str) -> Optional[str]:
         """
-        Заполняет таблицу 'cities' данными из JSON-файла.
+        Получает значение служебной отметки (версии схемы, справочных данных и т.п.) из таблицы 'schema_meta'.
 
         Args:
-            json_file_path (str): Путь к JSON-файлу с данными о городах.
+            key (str): Ключ отметки.
 
         Returns:
-            None
+            Optional[str]: Значение отметки или None, если отметки, таблицы или самой базы данных еще нет.
         """
-        if self.check_table_has_data('cities'):
-            print("Таблица cities уже заполнена.")
-            return
-        with open(json_file_path, 'r', encoding='utf-8') as json_file:
-            data = json.load(json_file)
-
-        def add_cities(region_id, city_data):
-            cities_data = [(int(city['id']), city['name'], region_id) for city in city_data]
-            query = sql.SQL("INSERT INTO cities (city_id, city_name, region_id) VALUES (%s, %s, %s)")
-            self._execute_query(query, cities_data)
-
-        cities_to_insert = []
-
-        for region in data['areas']:
-            if int(region['id']) not in (1, 2):
-                add_cities(int(region['id']), region['areas'])
-
-        # Добавляем Москву и Санкт-Петербург отдельно
-        for region in data['areas']:
-            if int(region['id']) in (1, 2):
-                city_name = region['name']
-                region_id = int(region['id'])
-                cities_to_insert.append((region_id, city_name, region_id))
+        try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(sql.SQL("SELECT value FROM schema_meta WHERE key = %s"), (key,))
+                result = cursor.fetchone()
+                return result[0] if result else None
+        except psycopg2.Error:
+            # Отсутствие базы данных или таблицы при первом запуске - ожидаемая ситуация
+            return None
 
-        query = sql.SQL("INSERT INTO cities (city_id, city_name, region_id) VALUES (%s, %s, %s)")
-        self._execute_query(query, cities_to_insert)
+    def set_meta(self, key: str, value: str) -> None:
+        """
+        Сохраняет значение служебной отметки в таблицу 'schema_meta'.
 
-        russia_query = sql.SQL("INSERT INTO cities (city_id, city_name, region_id) VALUES (%s, %s, %s)")
-        russia_data = (113, 'Россия', 113)
-        self._execute_query(russia_query, [russia_data])
+        Args:
+            key (str): Ключ отметки.
+            value (str): Значение отметки.
 
-        print("Данные о городах успешно добавлены в таблицу cities.")
+        Returns:
+            None
+        """
+        query = sql.SQL("""
+            INSERT INTO schema_meta (key, value) VALUES (%s, %s)
+            ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value
+        """)
+        self._execute_query(query, [(key, value)])
 
-    def fill_industries_from_json(self, json_file_path: str) -> None:
+    def check_table_has_data(self, table_name: str) -> bool:
         """
-        Заполняет таблицу 'industries' данными из JSON-файла.
+        Проверяет наличие записей в указанной таблице.
 
         Args:
-            json_file_path (str): Путь к JSON-файлу с данными об отраслях.
+            table_name (str): Название таблицы для проверки.
 
         Returns:
-            None
+            bool: True, если таблица содержит записи, иначе False.
         """
-        if self.check_table_has_data('industries'):
-            print("Таблица industries уже заполнена.")
-            return
+        query = sql.SQL(f"SELECT COUNT(*) FROM {table_name}")
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as json_file:
-                data = json.load(json_file)
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(query)
+                count = cursor.fetchone()[0]
+            return count > 0
+        except psycopg2.Error as e:
+            print(f"Ошибка при проверке наличия записей в таблице {table_name}:", e)
+            return False
 
-            industries_data = [(float(industry['id']), industry['name']) for industry_dict in data for industry in
-                               industry_dict.get('industries', [])]
+    def load_reference_data(self, snapshot: Dict[str, Any]) -> bool:
+        """
+        Заполняет таблицы 'regions', 'cities' и 'industries' из снимка справочных данных
+        в одной транзакции с помощью COPY. Уже заполненные таблицы пропускаются.
 
-            query = sql.SQL("INSERT INTO industries (id_industry, name_industry) VALUES (%s, %s)")
-            self._execute_query(query, industries_data)
+        Args:
+            snapshot (Dict[str, Any]): Снимок справочных данных (см. reference_data.load_reference_snapshot).
 
-            print("Данные об отраслях успешно добавлены в таблицу industries.")
-        except Exception as e:
-            print("Ошибка при добавлении данных об отраслях из JSON-файла:", e)
+        Returns:
+            bool: True, если справочные данные загружены или уже были в базе, иначе False.
+        """
+        tables = (
+            ('regions', ('region_id', 'region_name'), snapshot['regions']),
+            ('cities', ('city_id', 'city_name', 'region_id'), snapshot['cities']),
+            ('industries', ('id_industry', 'name_industry'), snapshot['industries']),
+        )
+        try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                for table_name, columns, rows in tables:
+                    cursor.execute(sql.SQL("SELECT EXISTS (SELECT 1 FROM {})").format(sql.Identifier(table_name)))
+                    if cursor.fetchone()[0]:
+                        print(f"Таблица {table_name} уже заполнена.")
+                        continue
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(rows)
+                    buffer.seek(0)
+                    copy_query = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                        sql.Identifier(table_name), sql.SQL(', ').join(map(sql.Identifier, columns)))
+                    cursor.copy_expert(copy_query, buffer)
+                    print(f"Данные успешно добавлены в таблицу {table_name}: {len(rows)} записей.")
+            conn.commit()
+            return True
+        except psycopg2.Error as e:
+            print("Ошибка при загрузке справочных данных:", e)
+            return False
 
     def fill_employers_from_info(self, companies_info: List[Dict[str, Any]]) -> None:
         """
         Заполняет таблицы 'employers' и 'employer_industry' данными о работодателях и их отраслях.
+        Строки с неизвестным городом или отраслью, а также уже существующие работодатели отклоняются заранее,
+        остальные ошибки изолируются построчно. Отклоненные строки сохраняются в таблицу 'load_quarantine'.
 
         Args:
             companies_info (List[Dict[str, Any]]): Список словарей с информацией о работодателях.
@@ -254,29 +457,56 @@ class DatabaseManager:
             None
         """
         try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                city_ids = self._get_reference_ids(cursor, 'cities')
+                industry_ids = self._get_reference_ids(cursor, 'industries')
+                cursor.execute(sql.SQL("SELECT employer_id FROM employers WHERE employer_id = ANY(%s)"),
+                               ([int(company_info['id']) for company_info in companies_info],))
+                known_employer_ids = {row[0] for row in cursor.fetchall()}
+
+                employers_data = []
+                rejected_employers = []
+                for company_info in companies_info:
+                    row = (int(company_info['id']),
+                           company_info['name'],
+                           company_info['accredited_it_employer'],
+                           company_info['alternate_url'],
+                           int(company_info['area']['id']))
+                    if row[0] in known_employer_ids:
+                        rejected_employers.append((row, "работодатель уже есть в базе"))
+                    elif row[4] not in city_ids:
+                        rejected_employers.append((row, f"город {row[4]} отсутствует в таблице cities"))
+                    else:
+                        employers_data.append(row)
+                        known_employer_ids.add(row[0])
+                rejected_employers += self._execute_values_isolated(cursor, """
+                    INSERT INTO employers (employer_id, company_name, accredited_it_employer, employer_url, city_id)
+                    VALUES %s
+                """, employers_data)
+                loaded_ids = {row[0] for row in employers_data} - {row[0] for row, _ in rejected_employers}
+
+                employer_industry_data = []
+                rejected_industries = []
+                for company_info in companies_info:
+                    if int(company_info['id']) not in loaded_ids:
+                        continue
+                    for industry in company_info.get('industries') or []:
+                        row = (int(company_info['id']), float(industry['id']))
+                        if industry['id'] in industry_ids:
+                            employer_industry_data.append(row)
+                        else:
+                            rejected_industries.append((row, f"отрасль {industry['id']} отсутствует в таблице industries"))
+                rejected_industries += self._execute_values_isolated(cursor, """
+                    INSERT INTO employer_industry (employer_id, industry_id) VALUES %s
+                """, employer_industry_data)
+
+                self._quarantine(cursor, 'employers', rejected_employers)
+                self._quarantine(cursor, 'employer_industry', rejected_industries)
+            conn.commit()
 
-            employers_data = [(company_info['id'],
-                               company_info['name'],
-                               company_info['accredited_it_employer'],
-                               company_info['alternate_url'],
-                               company_info['area']['id']
-                               ) for company_info in companies_info]
-            employer_industry_data = [
-                (company_info['id'], float(industry['id']))
-                for company_info in companies_info
-                for industry in company_info.get('industries', None)
-            ]
-            if employers_data:
-                employers_query = sql.SQL(
-                    "INSERT INTO employers (employer_id, company_name, accredited_it_employer, employer_url, city_id) VALUES (%s, %s, %s, %s, %s)")
-                self._execute_query(employers_query, employers_data)
-            if employer_industry_data:
-                employer_industry_query = sql.SQL(
-                    "INSERT INTO employer_industry (employer_id, industry_id) VALUES (%s, %s)")
-                self._execute_query(employer_industry_query, employer_industry_data)
-            companies = [company_info['name'] for company_info in companies_info]
-            for company in companies:
-                print(f"Данные о работодатее {company} успешно добавлены в таблицы employers и employers_industry.")
+            for company_info in companies_info:
+                if int(company_info['id']) in loaded_ids:
+                    print(f"Данные о работодатее {company_info['name']} успешно добавлены в таблицы employers и employers_industry.")
 
         except Exception as e:
             print("Ошибка при добавлении данных в таблицы", e)
@@ -305,57 +535,373 @@ class DatabaseManager:
             print("Ошибка при проверке наличия работодателя в базе:", e)
             return True
 
-    def fill_vacancies(self, vacancies_data: List[Dict[str, Any]], currencies: Dict[str, float]) -> None:
+    def upsert_employer_directory(self, employers: List[Dict[str, Any]]) -> None:
         """
-        Заполняет таблицу 'vacancies' данными о вакансиях.
+        Добавляет или обновляет записи локального справочника работодателей 'employer_directory'.
+        Принимает любые данные о работодателях из ответов API: результаты поиска, подробную информацию
+        о компании и сведения о работодателе из вакансий. Поля, отсутствующие в кратких данных
+        (город, отрасли), не затирают ранее сохраненные значения.
 
         Args:
-            vacancies_data (List[Dict[str, Any]]): Список словарей с информацией о вакансиях.
-            currencies (Dict[str, float]): Словарь с данными о курсах валют.
+            employers (List[Dict[str, Any]]): Список словарей с данными о работодателях из API hh.ru.
 
         Returns:
             None
         """
+        directory_data = []
+        for employer in employers:
+            if not employer.get('id') or not employer.get('name'):
+                continue
+            detailed = 'area' in employer
+            industries = None
+            if 'industries' in employer:
+                industries = ', '.join(industry['name'] for industry in employer['industries'] or [])
+            directory_data.append((int(employer['id']),
+                                   employer['name'],
+                                   normalize_company_name(employer['name']),
+                                   employer['area']['name'] if detailed and employer['area'] else None,
+                                   industries,
+                                   employer.get('open_vacancies'),
+                                   employer.get('alternate_url'),
+                                   detailed))
+        if not directory_data:
+            return
+        query = sql.SQL("""
+            INSERT INTO employer_directory (employer_id, company_name, name_normalized, city_name, industries,
+                                            open_vacancies, employer_url, updated_at, details_updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, NOW(), CASE WHEN %s THEN NOW() END)
+            ON CONFLICT (employer_id) DO UPDATE SET
+                company_name = EXCLUDED.company_name,
+                name_normalized = EXCLUDED.name_normalized,
+                city_name = COALESCE(EXCLUDED.city_name, employer_directory.city_name),
+                industries = COALESCE(EXCLUDED.industries, employer_directory.industries),
+                open_vacancies = COALESCE(EXCLUDED.open_vacancies, employer_directory.open_vacancies),
+                employer_url = COALESCE(EXCLUDED.employer_url, employer_directory.employer_url),
+                updated_at = NOW(),
+                details_updated_at = COALESCE(EXCLUDED.details_updated_at, employer_directory.details_updated_at)
+        """)
+        self._execute_query(query, directory_data)
+
+    def search_employer_directory(self, company_name: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Ищет работодателей в локальном справочнике по нормализованному названию с помощью триграммного индекса.
+        Если расширение pg_trgm не установлено, ищутся названия, содержащие запрос, сначала самые короткие.
+
+        Args:
+            company_name (str): Запрос пользователя для поиска компании по названию.
+            limit (int, optional): Максимальное количество найденных работодателей. По умолчанию 100.
+
+        Returns:
+            List[Dict[str, Any]]: Список найденных работодателей, отсортированный по похожести названия.
+            Поле 'is_stale' равно True, если подробные сведения о работодателе отсутствуют или устарели.
+        """
+        normalized = normalize_company_name(company_name)
+        if not normalized:
+            return []
         try:
-            vacancies_to_insert = []
-            unique_vacancy_ids = set()
+            with self._get_connection() as conn, conn.cursor(cursor_factory=DictCursor) as cursor:
+                if self._has_trigram(cursor):
+                    query = sql.SQL("""
+                        SELECT employer_id, company_name, city_name, industries,
+                               details_updated_at IS NULL
+                                   OR details_updated_at < NOW() - make_interval(days => %s) AS is_stale
+                        FROM employer_directory
+                        WHERE name_normalized %% %s OR name_normalized LIKE %s
+                        ORDER BY similarity(name_normalized, %s) DESC
+                        LIMIT %s
+                    """)
+                    params = (DIRECTORY_STALE_DAYS, normalized, f'%{normalized}%', normalized, limit)
+                else:
+                    query = sql.SQL("""
+                        SELECT employer_id, company_name, city_name, industries,
+                               details_updated_at IS NULL
+                                   OR details_updated_at < NOW() - make_interval(days => %s) AS is_stale
+                        FROM employer_directory
+                        WHERE name_normalized LIKE %s
+                        ORDER BY length(name_normalized), name_normalized
+                        LIMIT %s
+                    """)
+                    params = (DIRECTORY_STALE_DAYS, f'%{normalized}%', limit)
+                cursor.execute(query, params)
+                return [dict(row) for row in cursor.fetchall()]
+        except psycopg2.Error as e:
+            print("Ошибка при поиске работодателя в локальном справочнике:", e)
+            return []
+
+    def get_existing_employer_ids(self, employer_ids: List[int]) -> set[int]:
+        """
+        Проверяет наличие работодателей в базе данных одним запросом.
+
+        Args:
+            employer_ids (List[int]): ID работодателей для проверки.
+
+        Returns:
+            set[int]: ID работодателей, которые уже есть в базе.
+        """
+        try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                query = sql.SQL("SELECT employer_id FROM employers WHERE employer_id = ANY(%s)")
+                cursor.execute(query, (list(employer_ids),))
+                return {row[0] for row in cursor.fetchall()}
+        except psycopg2.Error as e:
+            print("Ошибка при проверке наличия работодателей в базе:", e)
+            return set(employer_ids)
+
+    def track_employers(self, employer_ids: List[int]) -> None:
+        """
+        Добавляет работодателей в список отслеживаемых для регулярного обновления вакансий.
+        Уже отслеживаемые работодатели и работодатели, которых нет в таблице 'employers', пропускаются.
+
+        Args:
+            employer_ids (List[int]): ID работодателей.
+
+        Returns:
+            None
+        """
+        if not employer_ids:
+            return
+        query = sql.SQL("""
+            INSERT INTO tracked_employers (employer_id)
+            SELECT employer_id FROM employers WHERE employer_id = ANY(%s)
+            ON CONFLICT (employer_id) DO NOTHING
+        """)
+        self._execute_query(query, [(list(employer_ids),)])
+
+    def get_due_tracked_employers(self) -> List[Dict[str, Any]]:
+        """
+        Получает отслеживаемых работодателей, для которых подошло время обновления.
+        Раньше идут давно ожидающие обновления, а при равном времени - работодатели с большей изменчивостью.
+
+        Returns:
+            List[Dict[str, Any]]: Записи с ключами employer_id, open_vacancies, churn_rate и hours_since_refresh
+            (None, если работодатель еще не обновлялся).
+        """
+        try:
+            with self._get_connection() as conn, conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(sql.SQL("""
+                    SELECT employer_id, open_vacancies, churn_rate,
+                           EXTRACT(EPOCH FROM NOW() - last_refreshed_at)::float / 3600 AS hours_since_refresh
+                    FROM tracked_employers
+                    WHERE next_refresh_at <= NOW()
+                    ORDER BY next_refresh_at, churn_rate DESC
+                """))
+                return [dict(row) for row in cursor.fetchall()]
+        except psycopg2.Error as e:
+            print("Ошибка при получении отслеживаемых работодателей:", e)
+            return []
+
+    def get_seconds_to_next_refresh(self) -> Optional[float]:
+        """
+        Получает время до ближайшего запланированного обновления отслеживаемых работодателей.
+
+        Returns:
+            Optional[float]: Количество секунд (0, если обновление уже просрочено) или None,
+            если отслеживаемых работодателей нет.
+        """
+        try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(sql.SQL("""
+                    SELECT GREATEST(EXTRACT(EPOCH FROM MIN(next_refresh_at) - NOW())::float, 0)
+                    FROM tracked_employers
+                """))
+                return cursor.fetchone()[0]
+        except psycopg2.Error as e:
+            print("Ошибка при получении времени следующего обновления:", e)
+            return None
+
+    def save_refresh_schedule(self, schedule: List[Tuple[int, Optional[int], Optional[float], float]]) -> None:
+        """
+        Сохраняет результаты обновления отслеживаемых работодателей и планирует их следующее обновление.
+        Если количество вакансий и изменчивость не переданы (обновление не удалось), сохраняются прежние
+        значения и время последнего обновления, а переносится только время следующего обновления.
+
+        Args:
+            schedule (List[Tuple[int, Optional[int], Optional[float], float]]): Кортежи (ID работодателя,
+                количество вакансий, изменчивость, интервал до следующего обновления в секундах).
+
+        Returns:
+            None
+        """
+        if not schedule:
+            return
+        try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                execute_values(cursor, """
+                    UPDATE tracked_employers AS t
+                    SET open_vacancies = COALESCE(d.open_vacancies, t.open_vacancies),
+                        churn_rate = COALESCE(d.churn_rate, t.churn_rate),
+                        last_refreshed_at = CASE WHEN d.open_vacancies IS NULL THEN t.last_refreshed_at ELSE NOW() END,
+                        next_refresh_at = NOW() + make_interval(secs => d.interval_seconds)
+                    FROM (VALUES %s) AS d (employer_id, open_vacancies, churn_rate, interval_seconds)
+                    WHERE t.employer_id = d.employer_id
+                """, schedule, template="(%s::int, %s::int, %s::real, %s::float)")
+            conn.commit()
+        except psycopg2.Error as e:
+            print("Ошибка при сохранении расписания обновлений:", e)
+
+    def archive_missing_vacancies(self, employer_ids: List[int], open_vacancy_ids: List[int]) -> Dict[int, int]:
+        """
+        Отмечает архивными открытые вакансии работодателей, которых нет среди полученных из API,
+        и записывает их новой версией в таблицу 'vacancy_history'. Хеш содержимого таких вакансий сбрасывается,
+        чтобы вновь появившаяся вакансия была обновлена при следующей загрузке.
+
+        Args:
+            employer_ids (List[int]): ID работодателей, вакансии которых получены полностью.
+            open_vacancy_ids (List[int]): ID полученных открытых вакансий этих работодателей.
+
+        Returns:
+            Dict[int, int]: Количество закрытых вакансий по ID работодателя.
+        """
+        closed = {}
+        if not employer_ids:
+            return closed
+        try:
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(sql.SQL("""
+                    UPDATE vacancies
+                    SET archived = TRUE, content_hash = NULL
+                    WHERE employer_id = ANY(%s) AND archived IS NOT TRUE AND NOT vacancy_id = ANY(%s)
+                    RETURNING vacancy_id, employer_id, vacancy_title, salary
+                """), (list(employer_ids), list(open_vacancy_ids)))
+                history_rows = []
+                for vacancy_id, employer_id, vacancy_title, salary in cursor.fetchall():
+                    history_rows.append((vacancy_id, vacancy_title, salary, True))
+                    closed[employer_id] = closed.get(employer_id, 0) + 1
+                if history_rows:
+                    execute_values(cursor, """
+                        INSERT INTO vacancy_history (vacancy_id, vacancy_title, salary, archived) VALUES %s
+                    """, history_rows)
+            conn.commit()
+        except psycopg2.Error as e:
+            print("Ошибка при закрытии вакансий:", e)
+            return {}
+        return closed
+
+    def fill_vacancies(self, vacancies_data: List[VacancyRecord], currencies: Dict[str, float]) -> Dict[str, int]:
+        """
+        Заполняет таблицу 'vacancies' данными о вакансиях. Для каждой вакансии вычисляется хеш содержимого
+        и сравнивается с сохраненным: новые вакансии добавляются, измененные обновляются, неизменные пропускаются.
+        Новые и измененные вакансии также записываются новой версией в таблицу 'vacancy_history',
+        а прежние ячейки агрегатов зарплат измененных вакансий отмечаются в 'salary_rollup_dirty'.
+        Вакансии с неизвестной валютой, городом или работодателем отклоняются заранее, остальные ошибки
+        изолируются построчно. Отклоненные строки сохраняются в таблицу 'load_quarantine'.
+
+        Args:
+            vacancies_data (List[VacancyRecord]): Список записей о вакансиях. Словари вакансий в формате API
+                также принимаются и преобразуются в записи.
+            currencies (Dict[str, float]): Словарь с данными о курсах валют.
+
+        Returns:
+            Dict[str, int]: Количество добавленных ('inserted'), обновленных ('updated'),
+            неизменных ('unchanged') и отклоненных ('rejected') вакансий.
+        """
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+        try:
+            vacancies_to_load = {}
+            rejected = []
             for vacancy in vacancies_data:
-                vacancy_id = int(vacancy['id'])
-                if vacancy_id not in unique_vacancy_ids:
-                    unique_vacancy_ids.add(vacancy_id)
-                    vacancy_title = vacancy['name']
-                    city_id = int(vacancy['area']['id'])
-                    published_at = vacancy['published_at']
-                    archived = vacancy['archived']
-                    address = vacancy['address']['raw'] if vacancy['address'] and 'raw' in vacancy['address'] else None
-                    employer_id = vacancy['employer']['id']
-                    vacancy_url = vacancy['alternate_url']
+                if isinstance(vacancy, dict):
+                    vacancy = VacancyRecord.from_dict(vacancy)
+                if vacancy.vacancy_id not in vacancies_to_load:
 
                     salary = None
-                    if vacancy['salary']:
-                        if vacancy['salary']['to']:
-                            salary = vacancy['salary']['to']
-                        if vacancy['salary']['from']:
-                            salary = vacancy['salary']['from']
+                    if vacancy.salary_to:
+                        salary = vacancy.salary_to
+                    if vacancy.salary_from:
+                        salary = vacancy.salary_from
+
+                    row = (vacancy.vacancy_id, vacancy.title, vacancy.city_id, salary, vacancy.published_at,
+                           vacancy.archived, vacancy.address, vacancy.employer_id, vacancy.url,
+                           vacancy.content_hash())
 
                     # конвертируем все зарплаты в одну валюту
                     if salary is not None:
-                        salary /= currencies[vacancy['salary']['currency']]
+                        if vacancy.currency not in currencies:
+                            # В карантин попадает строка с зарплатой в исходной валюте
+                            rejected.append((row, f"неизвестная валюта {vacancy.currency}"))
+                            continue
+                        salary /= currencies[vacancy.currency]
 
                         # переводим все зарплаты в вариант после уплаты налога:
-                        if vacancy['salary']['gross']:
+                        if vacancy.gross:
                             salary -= salary * 0.13
 
-                    vacancies_to_insert.append((vacancy_id, vacancy_title, city_id, salary, published_at, archived,
-                                                address, employer_id, vacancy_url))
+                    vacancies_to_load[vacancy.vacancy_id] = row[:3] + (salary,) + row[4:]
 
-            query = sql.SQL(
-                "INSERT INTO vacancies (vacancy_id, vacancy_title, city_id, salary, published_at, archived, address, employer_id, vacancy_url) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)")
-            self._execute_query(query, vacancies_to_insert)
+            with self._get_connection() as conn, conn.cursor() as cursor:
+                # Проверяем внешние ключи по множествам ID до записи
+                city_ids = self._get_reference_ids(cursor, 'cities')
+                cursor.execute(sql.SQL("SELECT employer_id FROM employers WHERE employer_id = ANY(%s)"),
+                               (list({row[7] for row in vacancies_to_load.values() if row[7] is not None}),))
+                employer_ids = {row[0] for row in cursor.fetchall()}
+                valid_rows = {}
+                for vacancy_id, row in vacancies_to_load.items():
+                    if row[2] not in city_ids:
+                        rejected.append((row, f"город {row[2]} отсутствует в таблице cities"))
+                    elif row[7] not in employer_ids:
+                        rejected.append((row, f"работодатель {row[7]} отсутствует в таблице employers"))
+                    else:
+                        valid_rows[vacancy_id] = row
+
+                # Сравниваем хеши с сохраненными одним запросом. Заодно запоминаем ячейки агрегатов зарплат
+                # (регион, месяц), в которых вакансия учтена сейчас: после изменения они требуют пересчета
+                cursor.execute(sql.SQL("""
+                    SELECT v.vacancy_id, v.content_hash, c.region_id, date_trunc('month', v.published_at)::date
+                    FROM vacancies v
+                    LEFT JOIN cities c ON v.city_id = c.city_id
+                    WHERE v.vacancy_id = ANY(%s)
+                """), (list(valid_rows),))
+                stored_hashes = {}
+                stored_cells = {}
+                for vacancy_id, content_hash, region_id, month in cursor.fetchall():
+                    stored_hashes[vacancy_id] = content_hash
+                    stored_cells[vacancy_id] = (region_id, month)
+                new_rows = [row for vacancy_id, row in valid_rows.items() if vacancy_id not in stored_hashes]
+                changed_rows = [row for vacancy_id, row in valid_rows.items()
+                                if vacancy_id in stored_hashes and stored_hashes[vacancy_id] != row[-1]]
+
+                failed = self._execute_values_isolated(cursor, """
+                    INSERT INTO vacancies (vacancy_id, vacancy_title, city_id, salary, published_at, archived,
+                                           address, employer_id, vacancy_url, content_hash)
+                    VALUES %s
+                """, new_rows)
+                failed += self._execute_values_isolated(cursor, """
+                    UPDATE vacancies AS v
+                    SET vacancy_title = d.vacancy_title, city_id = d.city_id, salary = d.salary,
+                        published_at = d.published_at, archived = d.archived, address = d.address,
+                        employer_id = d.employer_id, vacancy_url = d.vacancy_url, content_hash = d.content_hash
+                    FROM (VALUES %s) AS d (vacancy_id, vacancy_title, city_id, salary, published_at, archived,
+                                           address, employer_id, vacancy_url, content_hash)
+                    WHERE v.vacancy_id = d.vacancy_id
+                """, changed_rows, template="(%s::int, %s, %s::int, %s::numeric, %s::date, %s::boolean, %s, %s::int, %s, %s)")
+                failed_ids = {row[0] for row, _ in failed}
+                rejected += failed
+
+                history_rows = [(row[0], row[1], row[3], row[5]) for row in new_rows + changed_rows
+                                if row[0] not in failed_ids]
+                if history_rows:
+                    execute_values(cursor, """
+                        INSERT INTO vacancy_history (vacancy_id, vacancy_title, salary, archived) VALUES %s
+                    """, history_rows)
+                dirty_cells = {stored_cells[row[0]] for row in changed_rows if row[0] not in failed_ids}
+                dirty_cells = [cell for cell in dirty_cells if None not in cell]
+                if dirty_cells:
+                    execute_values(cursor, """
+                        INSERT INTO salary_rollup_dirty (region_id, month) VALUES %s ON CONFLICT DO NOTHING
+                    """, dirty_cells)
+                self._quarantine(cursor, 'vacancies', rejected)
+            conn.commit()
 
-            print("Данные о вакансиях успешно добавлены в таблицу vacancies.")
+            inserted = sum(1 for row in new_rows if row[0] not in failed_ids)
+            updated = sum(1 for row in changed_rows if row[0] not in failed_ids)
+            stats = {'inserted': inserted, 'updated': updated,
+                     'unchanged': len(valid_rows) - len(new_rows) - len(changed_rows), 'rejected': len(rejected)}
+            print(f"Данные о вакансиях загружены в таблицу vacancies: добавлено {stats['inserted']}, "
+                  f"обновлено {stats['updated']}, без изменений {stats['unchanged']}, "
+                  f"отклонено {stats['rejected']}.")
         except Exception as e:
             print("Ошибка при добавлении данных о вакансиях:", e)
+        return stats
 
     def get_companies_and_vacancies_count(self) -> List[Tuple[str, int]]:
         """
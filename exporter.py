@@ -0,0 +1,190 @@
+import argparse
+import os
+from datetime import date
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from psycopg2.extensions import encodings
+
+from database_manager import DatabaseManager
+
+# Размер порции строк, которую серверный курсор передает за один раз при выгрузке в Parquet
+CHUNK_SIZE = 50_000
+
+EXPORT_QUERY = """
+    SELECT v.vacancy_id, v.vacancy_title, v.salary, v.published_at, v.archived, v.address, v.vacancy_url,
+           e.employer_id, e.company_name, e.accredited_it_employer,
+           c.city_id, c.city_name, c.region_id, r.region_name
+    FROM vacancies v
+    LEFT JOIN employers e ON v.employer_id = e.employer_id
+    LEFT JOIN cities c ON v.city_id = c.city_id
+    LEFT JOIN regions r ON c.region_id = r.region_id
+"""
+
+
+class VacancyExporter:
+    """
+    Класс для потоковой выгрузки вакансий вместе с данными о работодателях и городах в файлы CSV и Parquet.
+    Данные не загружаются в память целиком: CSV выгружается через COPY ... TO STDOUT,
+    Parquet - порциями через серверный курсор.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Конструктор класса.
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных.
+        """
+        self.db_manager = db_manager
+
+    @staticmethod
+    def _build_query(cursor, employer_ids: Optional[List[int]] = None, region_ids: Optional[List[int]] = None,
+                     date_from: Optional[date] = None, date_to: Optional[date] = None) -> str:
+        """
+        Формирует запрос выгрузки с подставленными значениями фильтров.
+
+        Args:
+            cursor: Курсор, используемый для безопасной подстановки значений.
+            employer_ids (Optional[List[int]]): ID работодателей.
+            region_ids (Optional[List[int]]): ID регионов.
+            date_from (Optional[date]): Начальная дата публикации вакансии (включительно).
+            date_to (Optional[date]): Конечная дата публикации вакансии (включительно).
+
+        Returns:
+            str: SQL-запрос выгрузки.
+        """
+        conditions = []
+        params = []
+        if employer_ids:
+            conditions.append("v.employer_id = ANY(%s)")
+            params.append(list(employer_ids))
+        if region_ids:
+            conditions.append("c.region_id = ANY(%s)")
+            params.append(list(region_ids))
+        if date_from:
+            conditions.append("v.published_at >= %s")
+            params.append(date_from)
+        if date_to:
+            conditions.append("v.published_at <= %s")
+            params.append(date_to)
+        query = EXPORT_QUERY
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY v.vacancy_id"
+        return cursor.mogrify(query, params).decode(encodings[cursor.connection.encoding])
+
+    def export_csv(self, file_path: str, **filters) -> None:
+        """
+        Выгружает вакансии в CSV-файл с заголовком через COPY ... TO STDOUT.
+
+        Args:
+            file_path (str): Путь к CSV-файлу.
+            **filters: Фильтры employer_ids, region_ids, date_from, date_to.
+
+        Returns:
+            None
+        """
+        try:
+            with self.db_manager._get_connection() as conn, conn.cursor() as cursor, \
+                    open(file_path, 'wb') as csv_file:
+                query = self._build_query(cursor, **filters)
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", csv_file)
+                print(f"Выгружено {cursor.rowcount} вакансий в файл {file_path}.")
+        except Exception as e:
+            print("Ошибка при выгрузке вакансий в CSV:", e)
+
+    def export_parquet(self, file_path: str, chunk_size: int = CHUNK_SIZE, **filters) -> None:
+        """
+        Выгружает вакансии в Parquet-файл порциями через серверный курсор.
+        Каждая порция записывается отдельной группой строк. Требует установленного пакета pyarrow.
+
+        Args:
+            file_path (str): Путь к Parquet-файлу.
+            chunk_size (int, optional): Количество строк в одной порции. По умолчанию CHUNK_SIZE.
+            **filters: Фильтры employer_ids, region_ids, date_from, date_to.
+
+        Returns:
+            None
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("Для выгрузки в Parquet установите пакет pyarrow: poetry install --extras parquet")
+            return
+
+        schema = pa.schema([
+            ('vacancy_id', pa.int64()),
+            ('vacancy_title', pa.string()),
+            ('salary', pa.int64()),
+            ('published_at', pa.date32()),
+            ('archived', pa.bool_()),
+            ('address', pa.string()),
+            ('vacancy_url', pa.string()),
+            ('employer_id', pa.int64()),
+            ('company_name', pa.string()),
+            ('accredited_it_employer', pa.bool_()),
+            ('city_id', pa.int64()),
+            ('city_name', pa.string()),
+            ('region_id', pa.int64()),
+            ('region_name', pa.string()),
+        ])
+        exported = 0
+        try:
+            with self.db_manager._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    query = self._build_query(cursor, **filters)
+                with conn.cursor(name='vacancies_export') as cursor, pq.ParquetWriter(file_path, schema) as writer:
+                    cursor.itersize = chunk_size
+                    cursor.execute(query)
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        columns = list(zip(*rows))
+                        writer.write_table(pa.Table.from_arrays(
+                            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                            schema=schema))
+                        exported += len(rows)
+            print(f"Выгружено {exported} вакансий в файл {file_path}.")
+        except Exception as e:
+            print("Ошибка при выгрузке вакансий в Parquet:", e)
+
+    def export(self, file_path: str, file_format: str = 'csv', **filters) -> None:
+        """
+        Выгружает вакансии в файл указанного формата.
+
+        Args:
+            file_path (str): Путь к файлу.
+            file_format (str, optional): Формат файла: 'csv' или 'parquet'. По умолчанию 'csv'.
+            **filters: Фильтры employer_ids, region_ids, date_from, date_to.
+
+        Returns:
+            None
+        """
+        if file_format == 'parquet':
+            self.export_parquet(file_path, **filters)
+        else:
+            self.export_csv(file_path, **filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выгрузка вакансий с данными о работодателях и городах в файл.")
+    parser.add_argument('output', help="путь к файлу выгрузки")
+    parser.add_argument('--format', choices=('csv', 'parquet'), default='csv', help="формат файла")
+    parser.add_argument('--employer-id', type=int, action='append', dest='employer_ids', help="ID работодателя")
+    parser.add_argument('--region-id', type=int, action='append', dest='region_ids', help="ID региона")
+    parser.add_argument('--date-from', type=date.fromisoformat, help="дата публикации с (ГГГГ-ММ-ДД)")
+    parser.add_argument('--date-to', type=date.fromisoformat, help="дата публикации по (ГГГГ-ММ-ДД)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    db_manager = DatabaseManager(os.getenv('DB_HOST'), os.getenv('DB_NAME'), os.getenv('DB_USER'),
+                                 os.getenv('DB_PASSWORD'))
+    VacancyExporter(db_manager).export(args.output, args.format, employer_ids=args.employer_ids,
+                                       region_ids=args.region_ids, date_from=args.date_from, date_to=args.date_to)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,82 @@
+from collections import deque
+from datetime import datetime, timedelta
 from time import sleep
+from typing import Iterator, List, Dict, Union, Tuple, Optional
 import requests
-from typing import List, Dict, Union, Tuple
+
+from http_transport import HttpTransport
+from rate_controller import AdaptiveRateController, backoff_delay, parse_retry_after
+from reference_data import RUSSIA_ID
+from vacancy_record import VacancyRecord, decode_vacancies_page
+
+# Максимальное число попыток выполнить запрос при ответах 429, ошибках сервера и сетевых ошибках
+MAX_ATTEMPTS = 8
+VACANCIES_URL = 'https://api.hh.ru/vacancies'
+# Ограничение hh.ru на глубину выдачи по одному запросу
+MAX_DEPTH = 2000
+PER_PAGE = 100
+# Вакансии в выдаче hh.ru доступны за последние 30 дней
+SEARCH_PERIOD = timedelta(days=30)
+# Минимальный интервал дат публикации, на который еще делится часть запроса
+MIN_DATE_WINDOW = timedelta(hours=1)
+# Максимальное число работодателей в одном общем запросе
+MAX_EMPLOYERS_PER_QUERY = 20
+# Допустимое суммарное количество вакансий в общем запросе: запас от MAX_DEPTH на появление новых вакансий
+BATCH_DEPTH = 1800
+# Сколько раз часть запроса, не полученная после всех повторов, ставится в конец очереди
+PARTITION_RETRIES = 1
+# Общие параметры запросов вакансий работодателей. Справочник городов содержит только Россию
+EMPLOYER_QUERY = {
+    "locale": "RU",
+    "area": RUSSIA_ID,
+    "only_with_salary": True,
+}
+
+
+class ApiRequestError(Exception):
+    """
+    Запрос к API не удался после всех повторов.
+    """
+
+    def __init__(self, params: Dict, status: str):
+        super().__init__(f"запрос {params} завершился с ошибкой: {status}")
+        self.params = params
+        self.status = status
+
+
+def plan_employer_batches(found_by_employer: Dict[int, int], max_depth: int = BATCH_DEPTH,
+                          max_employers: int = MAX_EMPLOYERS_PER_QUERY) -> Tuple[List[List[int]], List[int]]:
+    """
+    Группирует работодателей в общие запросы с несколькими employer_id так, чтобы суммарное количество
+    вакансий в каждом запросе не превышало глубину выдачи (упаковка "первый подходящий по убыванию").
+
+    Аргументы:
+        found_by_employer (Dict[int, int]): ID работодателя -> количество его вакансий.
+        max_depth (int): Максимальное количество вакансий в одном запросе.
+        max_employers (int): Максимальное количество работодателей в одном запросе.
+
+    Возвращает:
+        Tuple[List[List[int]], List[int]]: Пакеты ID работодателей для общих запросов и ID крупных работодателей,
+        вакансии которых не помещаются в один запрос.
+    """
+    batches = []
+    batch_totals = []
+    large_employers = []
+    for employer_id, found in sorted(found_by_employer.items(), key=lambda item: item[1], reverse=True):
+        if not found:
+            continue
+        if found > max_depth:
+            large_employers.append(employer_id)
+            continue
+        for index, batch in enumerate(batches):
+            if batch_totals[index] + found <= max_depth and len(batch) < max_employers:
+                batch.append(employer_id)
+                batch_totals[index] += found
+                break
+        else:
+            batches.append([employer_id])
+            batch_totals.append(found)
+    return batches, large_employers
 
 
 class HeadHunterAPI:
@@ -8,74 +84,205 @@ class HeadHunterAPI:
     Класс для работы с API HeadHunter.
     """
 
-    def __init__(self, user_agent: str):
+    def __init__(self, user_agent: str, transport: Optional[HttpTransport] = None,
+                 rate_controller: Optional[AdaptiveRateController] = None):
         """
         Конструктор класса.
 
         Аргументы:
             user_agent (str): Заголовок User-Agent для запросов к API.
+            transport (Optional[HttpTransport]): Общий HTTP-транспорт. Если не передан, создается новый.
+            rate_controller (Optional[AdaptiveRateController]): Общий ограничитель темпа запросов.
+                Если не передан, создается новый.
         """
         self.processed_companies = {}
         self.user_agent = user_agent
-        self.headers = {'User-Agent': self.user_agent}
-        self.all_vacancies = []
+        self.transport = transport or HttpTransport(user_agent)
+        self.rate_controller = rate_controller or AdaptiveRateController()
+        self.all_vacancies: List[VacancyRecord] = []
+        self.seen_employers = {}
+        # Параметры запросов, вакансии по которым не удалось получить полностью
+        self.failed_partitions: List[Dict] = []
+
+    def _get(self, url: str, params: Optional[Dict] = None) -> Optional[requests.Response]:
+        """
+        Выполняет запрос к API с учетом темпа, заданного ограничителем. Ответы 429 и ошибки сервера
+        повторяются с экспоненциальной задержкой или через время, указанное в Retry-After.
+
+        Аргументы:
+            url (str): Адрес запроса.
+            params (Optional[Dict]): Параметры запроса.
 
-    def get_vacancies_by_areas(self, areas_data: List[int], employers_ids: List[int]):
+        Возвращает:
+            Optional[requests.Response]: Последний полученный ответ или None, если ответа получить не удалось.
+        """
+        response = None
+        for attempt in range(MAX_ATTEMPTS):
+            self.rate_controller.acquire()
+            try:
+                response = self.transport.get(url, params=params)
+            except requests.RequestException as e:
+                print(f"Ошибка сети при запросе к {url}: {e}")
+                self.rate_controller.on_failure()
+                response = None
+                sleep(backoff_delay(attempt))
+                continue
+            if response.status_code == 429 or response.status_code >= 500:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.rate_controller.on_throttle(retry_after)
+                if retry_after is None:
+                    sleep(backoff_delay(attempt))
+                continue
+            self.rate_controller.on_success()
+            return response
+        return response
+
+    @staticmethod
+    def _status(response: Optional[requests.Response]) -> str:
+        """
+        Возвращает код ответа для вывода в сообщении об ошибке.
+        """
+        return str(response.status_code) if response is not None else "нет ответа"
+
+    def _remember_employer(self, employer: Dict):
+        """
+        Запоминает данные о работодателе из любого ответа API для локального справочника работодателей.
+        Данные об одном и том же работодателе из разных ответов объединяются.
+
+        Аргументы:
+            employer (Dict): Данные о работодателе из ответа API.
+        """
+        if employer and employer.get('id'):
+            self.seen_employers.setdefault(str(employer['id']), {}).update(employer)
+
+    def _remember_vacancy_employers(self, vacancies: List[VacancyRecord]):
+        """
+        Запоминает работодателей, впервые встретившихся в записях о вакансиях.
+
+        Аргументы:
+            vacancies (List[VacancyRecord]): Записи о вакансиях.
+        """
+        for vacancy in vacancies:
+            if vacancy.employer_id and str(vacancy.employer_id) not in self.seen_employers:
+                self._remember_employer({'id': str(vacancy.employer_id), 'name': vacancy.employer_name})
+
+    def get_vacancies_by_areas(self, areas_data: List[List[int]], employers_ids: List[int]):
         """
         Получение вакансий по регионам и ID работодателей.
+        Небольшие работодатели объединяются в общие запросы с несколькими employer_id (см. plan_employer_batches),
+        а запросы по крупным работодателям делятся на части по группам регионов.
 
         Аргументы:
-            areas_data (List[int]): Список ID регионов.
+            areas_data (List[List[int]]): Группы ID регионов.
             employers_ids (List[int]): Список ID работодателей.
         """
-        per_page: int = 100
-        for employer_id in employers_ids:
-            params = {
-                "locale": "RU",
-                "employer_id": employer_id,
-                "only_with_salary": True
-            }
-            url: str = f'https://api.hh.ru/vacancies'
-            response = requests.get(url, headers=self.headers, params=params)
-            if response.status_code == 200:
-                response_data = response.json()
-                total_ru = response_data.get('found', 0)
-                if response_data.get('items', []):
-                    employer_name = response_data.get('items', [])[0].get('employer').get('name')
-                    print(f"У работодателя {employer_name} доступно {total_ru} вакансий")
-
-                    for num, area_ids in enumerate(areas_data, start=1):
-                        page: int = 0
-
-                        while True:
-                            sleep(0.5)
-                            params = {
-                                "employer_id": employer_id,
-                                "page": page,
-                                "per_page": per_page,
-                                "only_with_salary": True,
-                                "area": area_ids,
-                            }
-                            url = f'https://api.hh.ru/vacancies'
-                            response = requests.get(url, headers=self.headers, params=params)
-
-                            if response.status_code == 200:
-                                response_data = response.json()
-                                vacancies = response_data.get('items', [])
-                                total_region = response_data.get('found', 0)
-                                self.all_vacancies.extend(vacancies)
-                                print(f"Добавлено {len(self.all_vacancies)} вакансий компании  из {total_ru}: группа регионов {num}, "
-                                      f"страница {page + 1} из {total_region // 100 + 1} ")
-                                if total_region <= (page + 1) * per_page:
-                                    break
-                                else:
-                                    page += 1
-                            else:
-                                print(f"Запрос завершился с ошибкой: {response.status_code}")
-                                break
-                else:
-                    print("Нет вакансий у этой компании")
+        found_by_employer = self._probe_employers(employers_ids)
+        self.fetch_vacancies_by_estimates(areas_data, found_by_employer, exact=True)
+
+    def fetch_vacancies_by_estimates(self, areas_data: List[List[int]], found_by_employer: Dict[int, int],
+                                     exact: bool = False):
+        """
+        Получение вакансий работодателей по известному количеству их вакансий. Небольшие работодатели
+        объединяются в общие запросы без отдельных пробных запросов. Если общий запрос по первой странице
+        оказывается больше глубины выдачи, количество вакансий его работодателей уточняется пробными запросами,
+        и они распределяются заново. Вакансии крупных работодателей запрашиваются по частям.
+
+        Аргументы:
+            areas_data (List[List[int]]): Группы ID регионов.
+            found_by_employer (Dict[int, int]): ID работодателя -> количество его вакансий.
+            exact (bool): Количество вакансий только что получено пробными запросами. Иначе это оценка
+                (например, по прошлому обновлению), и для крупных работодателей она уточняется.
+        """
+        batches, large_employers = plan_employer_batches(found_by_employer)
+        overflowed = self._fetch_batches(batches)
+        if exact:
+            found_by_employer = {employer_id: found_by_employer[employer_id] for employer_id in large_employers}
+        else:
+            # Оценке крупного работодателя нельзя доверять: при ней запрос мог не разбиваться на части
+            overflowed += large_employers
+            found_by_employer = {}
+        if overflowed:
+            found_by_employer.update(self._probe_employers(overflowed))
+            batches, large_employers = plan_employer_batches(found_by_employer)
+            # Если вакансий стало больше и после уточнения, количество вакансий определит _plan_partitions
+            for employer_id in self._fetch_batches(batches):
+                found_by_employer[employer_id] = None
+                large_employers.append(employer_id)
+
+        for employer_id in large_employers:
+            self._fetch_large_employer(areas_data, employer_id, found_by_employer[employer_id])
+
+    def _probe_employers(self, employer_ids: List[int]) -> Dict[int, int]:
+        """
+        Получение количества вакансий каждого работодателя пробными запросами.
+
+        Аргументы:
+            employer_ids (List[int]): ID работодателей.
+
+        Возвращает:
+            Dict[int, int]: ID работодателя -> количество вакансий. Работодатели, запрос по которым
+            не удался, не включаются и сохраняются в failed_partitions.
+        """
+        found_by_employer = {}
+        for employer_id in employer_ids:
+            params = {**EMPLOYER_QUERY, "employer_id": employer_id}
+            try:
+                found, vacancies = self._probe(params)
+            except ApiRequestError as e:
+                self._failed(params, e)
+                continue
+            if vacancies:
+                print(f"У работодателя {vacancies[0].employer_name} доступно {found} вакансий")
+            else:
+                print("Нет вакансий у этой компании")
+            found_by_employer[employer_id] = found
+        return found_by_employer
+
+    def _fetch_batches(self, batches: List[List[int]]) -> List[int]:
+        """
+        Получение вакансий по общим запросам для пакетов работодателей. Пакет, в котором по первой странице
+        вакансий больше глубины выдачи, дальше не запрашивается.
+
+        Аргументы:
+            batches (List[List[int]]): Пакеты ID работодателей.
 
+        Возвращает:
+            List[int]: ID работодателей из пакетов, не уместившихся в глубину выдачи.
+        """
+        overflowed = []
+        partitions = [{**EMPLOYER_QUERY, "employer_id": batch} for batch in batches]
+        for num, (partition, found, vacancies) in enumerate(self._fetch_partitions(partitions, stop_on_overflow=True),
+                                                            start=1):
+            batch = partition["employer_id"]
+            if found > MAX_DEPTH:
+                overflowed.extend(batch)
+                continue
+            self._remember_vacancy_employers(vacancies)
+            self.all_vacancies.extend(vacancies)
+            print(f"Добавлено {len(self.all_vacancies)} вакансий: пакет {num} из {len(batches)} "
+                  f"({len(batch)} работодателей), темп {self.rate_controller.effective_rate:.1f} запросов/с")
+        return overflowed
+
+    def _fetch_large_employer(self, areas_data: List[List[int]], employer_id: int, found: Optional[int]):
+        """
+        Получение вакансий крупного работодателя по частям запроса.
+
+        Аргументы:
+            areas_data (List[List[int]]): Группы ID регионов.
+            employer_id (int): ID работодателя.
+            found (Optional[int]): Количество вакансий работодателя или None, если его нужно запросить.
+        """
+        params = {**EMPLOYER_QUERY, "employer_id": employer_id}
+        try:
+            partitions = self._plan_partitions(params, areas_data, found)
+        except ApiRequestError as e:
+            self._failed(params, e)
+            return
+        for num, (partition, _, vacancies) in enumerate(self._fetch_partitions(partitions), start=1):
+            self._remember_vacancy_employers(vacancies)
+            self.all_vacancies.extend(vacancies)
+            print(f"Добавлено {len(self.all_vacancies)} вакансий: работодатель {employer_id}, "
+                  f"часть {num} из {len(partitions)}, темп {self.rate_controller.effective_rate:.1f} запросов/с")
 
     def get_companies_info(self, company_names: List[str]):
         """
@@ -84,7 +291,7 @@ class HeadHunterAPI:
         Аргументы:
             company_names (List[str]): Список названий компаний.
         """
-        total_processed = 0
+        total_processed = len(self.processed_companies)
         for company_name in company_names:
             params = {
                 "locale": "RU",
@@ -94,19 +301,22 @@ class HeadHunterAPI:
                 "employer_type": "company"
             }
             url = f'https://api.hh.ru/employers'
-            response = requests.get(url, headers=self.headers, params=params)
-            if response.status_code == 200:
+            response = self._get(url, params=params)
+            if response is not None and response.status_code == 200:
                 response_data = response.json()
                 employers = response_data.get('items', [])
                 total = response_data.get('found', 0)
                 print(
                     f"По запросу {company_name} на hh.ru найдено {total} работодателей.")
+                for employer in employers:
+                    self._remember_employer(employer)
                 for employer in employers:
                     total_processed += 1
                     employer_url = employer['url']
-                    response = requests.get(employer_url, headers=self.headers)
-                    if response.status_code == 200:
+                    response = self._get(employer_url)
+                    if response is not None and response.status_code == 200:
                         response_data = response.json()
+                        self._remember_employer(response_data)
                         company_id = response_data['id']
                         name = response_data['name']
                         city = response_data['area']['name']
@@ -118,9 +328,26 @@ class HeadHunterAPI:
                             industry_info = ', '.join(industry['name'] for industry in industry_info)
                         print(f'{total_processed}. {name}, {city}. Отрасль - {industry_info}')
                     else:
-                        print(f"Запрос завершился с ошибкой: {response.status_code}")
+                        print(f"Запрос завершился с ошибкой: {self._status(response)}")
             else:
-                print(f"Запрос завершился с ошибкой: {response.status_code}")
+                print(f"Запрос завершился с ошибкой: {self._status(response)}")
+
+    def add_known_companies(self, company_name: str, companies: List[Dict]):
+        """
+        Добавляет к найденным компаниям работодателей из локального справочника, не обращаясь к API.
+
+        Аргументы:
+            company_name (str): Запрос пользователя, по которому найдены компании.
+            companies (List[Dict]): Записи локального справочника работодателей.
+        """
+        total_processed = len(self.processed_companies)
+        print(f"По запросу {company_name} в локальном справочнике найдено {len(companies)} работодателей.")
+        for company in companies:
+            total_processed += 1
+            self.processed_companies[total_processed] = (int(company['employer_id']), company['company_name'])
+            city = company['city_name'] or "город не указан"
+            industry_info = company['industries'] or "не указана"
+            print(f"{total_processed}. {company['company_name']}, {city}. Отрасль - {industry_info}")
 
     def fetch_company_info(self, company_ids: List[int]) -> List[Dict]:
         """
@@ -139,8 +366,223 @@ class HeadHunterAPI:
                 "employer_id": company_id
             }
             url = f'https://api.hh.ru/employers/{company_id}'
-            response = requests.get(url, headers=self.headers, params=params)
-            if response.status_code == 200:
+            response = self._get(url, params=params)
+            if response is not None and response.status_code == 200:
                 response_data = response.json()
+                self._remember_employer(response_data)
                 companies_info.append(response_data)
         return companies_info
+
+    def _probe(self, params: Dict) -> Tuple[int, List[VacancyRecord]]:
+        """
+        Получение количества вакансий, подходящих под параметры запроса, и первой из них.
+
+        Аргументы:
+            params (Dict): Параметры запроса к /vacancies.
+
+        Возвращает:
+            Tuple[int, List[VacancyRecord]]: Количество найденных вакансий и первая страница из одной вакансии.
+
+        Исключения:
+            ApiRequestError: Запрос не удался после всех повторов.
+        """
+        response = self._get(VACANCIES_URL, params={**params, "page": 0, "per_page": 1})
+        if response is None or response.status_code != 200:
+            raise ApiRequestError(params, self._status(response))
+        return decode_vacancies_page(response.content)
+
+    def _probe_found(self, params: Dict) -> int:
+        """
+        Получение количества вакансий, подходящих под параметры запроса, без загрузки самих вакансий.
+
+        Аргументы:
+            params (Dict): Параметры запроса к /vacancies.
+
+        Возвращает:
+            int: Количество найденных вакансий.
+
+        Исключения:
+            ApiRequestError: Запрос не удался после всех повторов.
+        """
+        return self._probe(params)[0]
+
+    def _split_by_dates(self, params: Dict, date_from: datetime, date_to: datetime) -> List[Dict]:
+        """
+        Делит запрос по интервалам дат публикации, пока в каждой части не окажется не больше MAX_DEPTH вакансий.
+
+        Аргументы:
+            params (Dict): Параметры запроса к /vacancies.
+            date_from (datetime): Начало интервала дат публикации.
+            date_to (datetime): Конец интервала дат публикации.
+
+        Возвращает:
+            List[Dict]: Параметры запросов для каждой части.
+
+        Исключения:
+            ApiRequestError: Пробный запрос не удался после всех повторов.
+        """
+        window_params = {**params,
+                         "date_from": date_from.isoformat(timespec='seconds'),
+                         "date_to": date_to.isoformat(timespec='seconds')}
+        found = self._probe_found(window_params)
+        if not found:
+            return []
+        if found <= MAX_DEPTH or date_to - date_from <= MIN_DATE_WINDOW:
+            if found > MAX_DEPTH:
+                print(f"Часть запроса {window_params} содержит {found} вакансий, будут получены первые {MAX_DEPTH}")
+            return [window_params]
+        middle = date_from + (date_to - date_from) / 2
+        return self._split_by_dates(params, date_from, middle) + self._split_by_dates(params, middle, date_to)
+
+    def _plan_partitions(self, params: Dict, areas_data: List[List[int]], found: Optional[int] = None) -> List[Dict]:
+        """
+        Делит запрос на части, в каждой из которых не больше MAX_DEPTH вакансий:
+        сначала по группам регионов, затем по отдельным регионам, затем по датам публикации.
+
+        Аргументы:
+            params (Dict): Параметры запроса к /vacancies.
+            areas_data (List[List[int]]): Группы ID регионов.
+            found (Optional[int]): Уже известное количество вакансий по запросу. Если не передано, запрашивается.
+
+        Возвращает:
+            List[Dict]: Параметры запросов для каждой части.
+
+        Исключения:
+            ApiRequestError: Пробный запрос не удался после всех повторов.
+        """
+        if found is None:
+            found = self._probe_found(params)
+        if not found:
+            return []
+        if found <= MAX_DEPTH:
+            return [params]
+        partitions = []
+        now = datetime.now().replace(microsecond=0)
+        for area_ids in areas_data:
+            group_params = {**params, "area": area_ids}
+            found = self._probe_found(group_params)
+            if not found:
+                continue
+            if found <= MAX_DEPTH:
+                partitions.append(group_params)
+                continue
+            for area_id in area_ids:
+                partitions.extend(self._split_by_dates({**params, "area": area_id}, now - SEARCH_PERIOD, now))
+        return partitions
+
+    def _fetch_partition(self, params: Dict, stop_on_overflow: bool = False) -> Tuple[int, List[VacancyRecord]]:
+        """
+        Получение всех страниц вакансий для одной части запроса.
+
+        Аргументы:
+            params (Dict): Параметры запроса к /vacancies.
+            stop_on_overflow (bool): Не запрашивать следующие страницы, если вакансий больше глубины выдачи.
+
+        Возвращает:
+            Tuple[int, List[VacancyRecord]]: Количество найденных вакансий и записи о вакансиях.
+
+        Исключения:
+            ApiRequestError: Одна из страниц не получена после всех повторов. Вакансии уже полученных страниц
+                при этом не возвращаются, чтобы часть запроса не была учтена как полученная полностью.
+        """
+        vacancies = []
+        page = 0
+        while True:
+            response = self._get(VACANCIES_URL, params={**params, "page": page, "per_page": PER_PAGE})
+            if response is None or response.status_code != 200:
+                raise ApiRequestError({**params, "page": page}, self._status(response))
+            found, page_vacancies = decode_vacancies_page(response.content)
+            vacancies.extend(page_vacancies)
+            if stop_on_overflow and found > MAX_DEPTH:
+                break
+            if not page_vacancies or (page + 1) * PER_PAGE >= min(found, MAX_DEPTH):
+                break
+            page += 1
+        return found, vacancies
+
+    def _fetch_partitions(self, partitions: List[Dict],
+                          stop_on_overflow: bool = False) -> Iterator[Tuple[Dict, int, List[VacancyRecord]]]:
+        """
+        Получение вакансий для нескольких частей запроса. Часть, которую не удалось получить, ставится
+        в конец очереди (до PARTITION_RETRIES раз), а затем сохраняется в failed_partitions.
+
+        Аргументы:
+            partitions (List[Dict]): Параметры запросов для каждой части.
+            stop_on_overflow (bool): Не запрашивать следующие страницы части, вакансий в которой больше
+                глубины выдачи.
+
+        Возвращает:
+            Iterator[Tuple[Dict, int, List[VacancyRecord]]]: Параметры, количество найденных вакансий
+            и вакансии каждой полностью полученной части.
+        """
+        queue = deque((partition, 0) for partition in partitions)
+        while queue:
+            partition, retries = queue.popleft()
+            try:
+                found, vacancies = self._fetch_partition(partition, stop_on_overflow)
+            except ApiRequestError as e:
+                if retries < PARTITION_RETRIES:
+                    print(f"Ошибка: {e}. Часть запроса будет повторена позже")
+                    queue.append((partition, retries + 1))
+                else:
+                    print(f"Ошибка: {e}. Вакансии этой части запроса не получены")
+                    self.failed_partitions.append(partition)
+                continue
+            yield partition, found, vacancies
+
+    def _failed(self, params: Dict, error: ApiRequestError) -> None:
+        """
+        Запоминает запрос, вакансии по которому не удалось получить.
+
+        Аргументы:
+            params (Dict): Параметры запроса.
+            error (ApiRequestError): Ошибка запроса.
+        """
+        print(f"Ошибка: {error}. Вакансии по этому запросу не получены")
+        self.failed_partitions.append(params)
+
+    def failed_employer_ids(self) -> set:
+        """
+        Возвращает ID работодателей, вакансии которых получены не полностью.
+
+        Возвращает:
+            set: ID работодателей.
+        """
+        employer_ids = set()
+        for params in self.failed_partitions:
+            employer_id = params.get("employer_id")
+            if isinstance(employer_id, list):
+                employer_ids.update(employer_id)
+            elif employer_id is not None:
+                employer_ids.add(employer_id)
+        return employer_ids
+
+    def discover_by_industries(self, industry_ids: List[str], areas_data: List[List[int]]):
+        """
+        Получение вакансий всех работодателей выбранных отраслей. Запрос по каждой отрасли делится на части,
+        укладывающиеся в ограничение глубины выдачи, а работодатели из вакансий запоминаются для регистрации.
+
+        Аргументы:
+            industry_ids (List[str]): ID отраслей из industries.json (например, "7" или "7.540").
+            areas_data (List[List[int]]): Группы ID регионов.
+        """
+        for industry_id in industry_ids:
+            # Справочник городов содержит только Россию, поэтому и запрос ограничивается ею
+            params = {
+                "locale": "RU",
+                "area": RUSSIA_ID,
+                "industry": industry_id,
+                "only_with_salary": True,
+            }
+            try:
+                partitions = self._plan_partitions(params, areas_data)
+            except ApiRequestError as e:
+                self._failed(params, e)
+                continue
+            print(f"Отрасль {industry_id}: запрос разбит на {len(partitions)} частей")
+            for num, (partition, _, vacancies) in enumerate(self._fetch_partitions(partitions), start=1):
+                self._remember_vacancy_employers(vacancies)
+                self.all_vacancies.extend(vacancies)
+                print(f"Отрасль {industry_id}: часть {num} из {len(partitions)}, всего получено "
+                      f"{len(self.all_vacancies)} вакансий, работодателей {len(self.seen_employers)}, "
+                      f"темп {self.rate_controller.effective_rate:.1f} запросов/с")
@@ -0,0 +1,68 @@
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Таймауты по умолчанию (установка соединения, чтение ответа), сек.
+DEFAULT_TIMEOUT = (5, 30)
+# Количество хостов, для которых хранятся пулы соединений
+POOL_CONNECTIONS = 4
+# Максимальное число одновременных соединений с одним хостом
+POOL_MAXSIZE = 8
+# Количество повторов при ошибках установки соединения
+CONNECT_RETRIES = 3
+
+
+class HttpTransport:
+    """
+    Общий HTTP-транспорт для всех запросов к API hh.ru и внешним ресурсам.
+    Использует одну сессию requests с пулом соединений: соединения переиспользуются (keep-alive),
+    ответы запрашиваются в сжатом виде, число соединений с одним хостом ограничено.
+    """
+
+    def __init__(self, user_agent: str, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE):
+        """
+        Конструктор класса.
+
+        Аргументы:
+            user_agent (str): Заголовок User-Agent для всех запросов.
+            timeout (Tuple[float, float]): Таймауты установки соединения и чтения ответа, сек.
+            pool_connections (int): Количество хостов, для которых хранятся пулы соединений.
+            pool_maxsize (int): Максимальное число одновременных соединений с одним хостом.
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        retries = Retry(total=CONNECT_RETRIES, connect=CONNECT_RETRIES, read=0, status=0,
+                        backoff_factor=0.5, allowed_methods=frozenset({'GET'}))
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              pool_block=True, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """
+        Выполняет GET-запрос через общий пул соединений.
+
+        Аргументы:
+            url (str): Адрес запроса.
+            params (Optional[Dict]): Параметры запроса.
+            **kwargs: Дополнительные аргументы requests (headers, timeout и т.д.).
+
+        Возвращает:
+            requests.Response: Ответ сервера.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, params=params, **kwargs)
+
+    def close(self) -> None:
+        """
+        Закрывает все соединения пула.
+        """
+        self.session.close()
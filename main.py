@@ -1,9 +1,14 @@
 import os
+import threading
 from dotenv import load_dotenv
 from database_manager import DatabaseManager
 from userinterface import UserInterface
 from hh_api_client import HeadHunterAPI
-from utils import get_regions_by_group, fetch_currency_data
+from http_transport import HttpTransport
+from rate_controller import AdaptiveRateController
+from salary_analytics import SalaryAnalytics
+from bootstrap import Bootstrap
+from config import USER_AGENT, AREAS, INDUSTRIES, MAX_POPULATION
 
 # Загрузка переменных окружения
 load_dotenv()
@@ -12,77 +17,178 @@ DB_HOST = os.getenv('DB_HOST')
 DB_NAME = os.getenv('DB_NAME')
 DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
-USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
-AREAS = 'areas.json'
-INDUSTRIES = 'industries.json'
-MAX_POPULATION = 8_000_000  #Для группировки регионов России по населению
 
-def main():
-    # Создаем экземпляр класса DatabaseManager, передавая параметры для подключения к базе данных
-    db_manager = DatabaseManager(DB_HOST, DB_NAME, DB_USER, DB_PASSWORD)
 
-    # Создаем базу данных, если она еще не существует
-    db_manager.create_database()
+def refresh_employer_directory(db_manager: DatabaseManager, transport: HttpTransport,
+                               rate_controller: AdaptiveRateController, employer_ids: list[int]) -> None:
+    """
+    Обновляет через API устаревшие записи локального справочника работодателей.
+    Выполняется в фоновом потоке, чтобы не задерживать ответ пользователю.
+    """
+    hh_api = HeadHunterAPI(USER_AGENT, transport, rate_controller)
+    hh_api.fetch_company_info(employer_ids)
+    db_manager.upsert_employer_directory(list(hh_api.seen_employers.values()))
+
+
+def search_companies(db_manager: DatabaseManager, hh_api: HeadHunterAPI, company_names: list[str]) -> list[str]:
+    """
+    Ищет компании сначала в локальном справочнике работодателей, а к API обращается только
+    по запросам, для которых в справочнике ничего не нашлось.
+
+    Возвращает:
+        list[str]: Запросы, на которые удалось ответить по локальному справочнику.
+    """
+    local_names = []
+    missing_names = []
+    stale_ids = []
+    for company_name in company_names:
+        companies = db_manager.search_employer_directory(company_name)
+        if companies:
+            hh_api.add_known_companies(company_name, companies)
+            local_names.append(company_name)
+            stale_ids.extend(company['employer_id'] for company in companies if company['is_stale'])
+        else:
+            missing_names.append(company_name)
+
+    if missing_names:
+        hh_api.get_companies_info(missing_names)
+        db_manager.upsert_employer_directory(list(hh_api.seen_employers.values()))
+
+    # Устаревшие и неполные записи справочника обновляем в фоне
+    if stale_ids:
+        threading.Thread(target=refresh_employer_directory,
+                         args=(db_manager, hh_api.transport, hh_api.rate_controller, stale_ids),
+                         daemon=True).start()
+    return local_names
+
+
+def save_employers_with_vacancies(db_manager: DatabaseManager, hh_api: HeadHunterAPI, bootstrap: Bootstrap,
+                                  analytics: SalaryAnalytics, new_ids: list[int]) -> None:
+    """
+    Регистрирует новых работодателей и сохраняет вакансии из hh_api.all_vacancies всех работодателей,
+    которые есть в базе данных.
+    """
+    # Сообщаем о частях запросов, вакансии по которым не удалось получить даже после повторов
+    if hh_api.failed_partitions:
+        print(f"Внимание: не удалось получить вакансии по {len(hh_api.failed_partitions)} частям запросов, "
+              f"загруженные данные неполные.")
+
+    # Получаем информацию о компаниях с использованием HeadHunter API
+    companies_info = hh_api.fetch_company_info(new_ids)
+
+    # Заполняем таблицу "employers" данными о работодателях (после загрузки справочника городов)
+    bootstrap.wait_reference_data()
+    db_manager.fill_employers_from_info(companies_info)
+
+    # Загружаем вакансии всех работодателей, которые есть в базе после регистрации, в том числе
+    # зарегистрированных ранее: неизменные вакансии пропускаются по хешу содержимого
+    employer_ids = {vacancy.employer_id for vacancy in hh_api.all_vacancies if vacancy.employer_id}
+    existing_ids = db_manager.get_existing_employer_ids(list(employer_ids))
+    vacancies = [vacancy for vacancy in hh_api.all_vacancies if vacancy.employer_id in existing_ids]
+    if vacancies:
+        # Заполняем таблицу "vacancies" данными о вакансиях
+        db_manager.fill_vacancies(vacancies, bootstrap.currencies)
+
+        # Пересчитываем агрегаты зарплат для регионов и месяцев, затронутых загруженными вакансиями
+        analytics.refresh_rollups(list(existing_ids))
+
+    # Сохраняем в справочник всех работодателей, встретившихся в ответах API
+    db_manager.upsert_employer_directory(list(hh_api.seen_employers.values()))
+
+
+def add_companies_by_name(db_manager: DatabaseManager, hh_api: HeadHunterAPI, bootstrap: Bootstrap,
+                          analytics: SalaryAnalytics) -> bool:
+    """
+    Поиск компаний по названию и загрузка выбранных пользователем работодателей с их вакансиями.
+
+    Возвращает:
+        bool: False, если ничего не найдено или не выбрано и поиск нужно повторить.
+    """
+    # Получаем от пользователя запросы для поиска компаний по названию
+    company_names = UserInterface.get_company_names()
+
+    # Ищем компании в локальном справочнике работодателей, а недостающие - с использованием HeadHunter API
+    local_names = search_companies(db_manager, hh_api, company_names)
+
+    # Если не удалось найти информацию о компаниях, предлагаем пользователю повторить запрос
+    if not hh_api.processed_companies:
+        print(f"К сожалению, по этому запросу ничего не удалось найти, попробуем еще раз?")
+        return False
+
+    # Получаем ID компаний, которые пользователь хочет добавить в базу данных
+    company_ids = UserInterface.get_companies_ids(hh_api.processed_companies)
+
+    # Если нужной компании не оказалось среди найденных в локальном справочнике, повторяем поиск через API
+    if not company_ids and local_names:
+        hh_api.processed_companies.clear()
+        hh_api.get_companies_info(local_names)
+        db_manager.upsert_employer_directory(list(hh_api.seen_employers.values()))
+        if hh_api.processed_companies:
+            company_ids = UserInterface.get_companies_ids(hh_api.processed_companies)
+
+    # Если пользователь не выбрал ни одной компании, повторяем поиск
+    if not company_ids:
+        return False
+
+    # Фильтруем ID компаний, оставляя только те, которых еще нет в базе данных
+    new_ids = [company_id for company_id in company_ids if db_manager.check_employer_exists_by_id(company_id)]
+
+    # Если есть новые компании для добавления
+    if new_ids:
+        # Получаем вакансии компаний с использованием HeadHunter API по группам регионов
+        hh_api.get_vacancies_by_areas(bootstrap.areas_data, new_ids)
+        save_employers_with_vacancies(db_manager, hh_api, bootstrap, analytics, new_ids)
+
+    # Выбранные пользователем работодатели регулярно обновляются планировщиком (scheduler.py)
+    db_manager.track_employers(company_ids)
+    return True
+
+
+def discover_industries(db_manager: DatabaseManager, hh_api: HeadHunterAPI, bootstrap: Bootstrap,
+                        analytics: SalaryAnalytics) -> None:
+    """
+    Обход всех вакансий выбранных отраслей и загрузка всех найденных в них новых работодателей.
+    """
+    industry_ids = UserInterface.get_industry_ids(bootstrap.snapshot['industry_groups'],
+                                                  bootstrap.snapshot['industries'])
+
+    # Получаем вакансии отраслей, разбивая запросы на части по регионам и датам публикации
+    hh_api.discover_by_industries(industry_ids, bootstrap.areas_data)
+
+    # Регистрируем только работодателей, которых еще нет в базе данных
+    employer_ids = {vacancy.employer_id for vacancy in hh_api.all_vacancies if vacancy.employer_id}
+    new_ids = sorted(employer_ids - db_manager.get_existing_employer_ids(list(employer_ids)))
+    print(f"Найдено {len(employer_ids)} работодателей, из них новых: {len(new_ids)}")
+    if new_ids:
+        save_employers_with_vacancies(db_manager, hh_api, bootstrap, analytics, new_ids)
 
-    # Создаем таблицы в базе данных, если они еще не созданы
-    db_manager.create_tables()
 
-    # Заполняем таблицу "regions" данными из JSON файла
-    db_manager.fill_regions_from_json(AREAS)
-
-    # Заполняем таблицу "cities" данными из JSON файла
-    db_manager.fill_cities_from_json(AREAS)
+def main():
+    # Создаем общий пул HTTP-соединений для всех запросов к API
+    transport = HttpTransport(USER_AGENT)
 
-    # Заполняем таблицу "industries" данными из JSON файла
-    db_manager.fill_industries_from_json(INDUSTRIES)
+    # Общий для всех запросов к API ограничитель темпа
+    rate_controller = AdaptiveRateController()
 
-    # Получаем сгруппированные по населению регионы России
-    areas_data = get_regions_by_group(MAX_POPULATION)
+    # Создаем экземпляр класса DatabaseManager, передавая параметры для подключения к базе данных
+    db_manager = DatabaseManager(DB_HOST, DB_NAME, DB_USER, DB_PASSWORD)
 
-    # Получаем данные о курсах валют
-    currencies = fetch_currency_data(USER_AGENT)
+    # Готовим базу данных: схема создается только при смене версии, а загрузка справочников,
+    # группировка регионов и курсы валют выполняются параллельно в фоне
+    bootstrap = Bootstrap(db_manager, transport, AREAS, INDUSTRIES, MAX_POPULATION, USER_AGENT)
+    bootstrap.start()
+    analytics = SalaryAnalytics(db_manager)
 
     while True:
         # Создаем экземпляр класса HeadHunterAPI, передавая User-Agent
-        hh_api = HeadHunterAPI(USER_AGENT)
-
-        # Получаем от пользователя запросы для поиска компаний по названию
-        company_names = UserInterface.get_company_names()
-
-        # Получаем информацию о компаниях с использованием HeadHunter API
-        hh_api.get_companies_info(company_names)
+        hh_api = HeadHunterAPI(USER_AGENT, transport, rate_controller)
 
-        # Если не удалось найти информацию о компаниях, предлагаем пользователю повторить запрос
-        if not hh_api.processed_companies:
-            print(f"К сожалению, по этому запросу ничего не удалось найти, попробуем еще раз?")
+        # Выбираем способ поиска работодателей: по названию или обход отраслей
+        if UserInterface.get_search_mode() == 'industry':
+            discover_industries(db_manager, hh_api, bootstrap, analytics)
+        elif not add_companies_by_name(db_manager, hh_api, bootstrap, analytics):
             continue
 
-        # Получаем ID компаний, которые пользователь хочет добавить в базу данных
-        company_ids = UserInterface.get_companies_ids(hh_api.processed_companies)
-
-        # Если пользователь не выбрал ни одной компании, переходим к следующей итерации цикла
-        if not company_ids:
-            continue
-
-        # Фильтруем ID компаний, оставляя только те, которых еще нет в базе данных
-        new_ids = [company_id for company_id in company_ids if db_manager.check_employer_exists_by_id(company_id)]
-
-        # Если есть новые компании для добавления
-        if new_ids:
-            # Получаем информацию о компаниях с использованием HeadHunter API
-            companies_info = hh_api.fetch_company_info(new_ids)
-
-            # Заполняем таблицу "employers" данными о работодателях
-            db_manager.fill_employers_from_info(companies_info)
-
-            # Получаем вакансии компаний с использованием HeadHunter API по группам регионов
-            hh_api.get_vacancies_by_areas(areas_data, new_ids)
-
-            # Если есть вакансии для добавления
-            if hh_api.all_vacancies:
-                # Заполняем таблицу "vacancies" данными о вакансиях
-                db_manager.fill_vacancies(hh_api.all_vacancies, currencies)
-
         # Запрашиваем у пользователя, хочет ли он добавить еще компаний в базу данных
         user_input = input("Хотите добавить еще компаний в базу данных? (да/нет): ").strip().lower()
         if user_input != 'да':
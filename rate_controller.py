@@ -0,0 +1,181 @@
+import random
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import monotonic, sleep
+from typing import Dict, Optional
+
+# Начальный, минимальный и максимальный темп запросов, запросов в секунду
+INITIAL_RATE = 2.0
+MIN_RATE = 0.2
+MAX_RATE = 10.0
+# Аддитивное увеличение темпа после успешного запроса и мультипликативное уменьшение после ошибки
+INCREASE_STEP = 0.05
+DECREASE_FACTOR = 0.5
+# Доля ошибок среди последних запросов, при которой темп перестает расти
+ERROR_RATE_THRESHOLD = 0.1
+ERROR_WINDOW = 50
+# Параметры экспоненциальной задержки между повторами, сек.
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Разбирает заголовок Retry-After (число секунд или HTTP-дата).
+
+    Аргументы:
+        value (Optional[str]): Значение заголовка.
+
+    Возвращает:
+        Optional[float]: Задержка в секундах или None, если заголовок отсутствует или некорректен.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Вычисляет задержку перед повтором запроса: экспоненциальный рост со случайным разбросом,
+    чтобы повторы из разных потоков не совпадали по времени.
+
+    Аргументы:
+        attempt (int): Номер попытки, начиная с 0.
+
+    Возвращает:
+        float: Задержка в секундах.
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class AdaptiveRateController:
+    """
+    Адаптивный ограничитель темпа запросов к API: token bucket, скорость пополнения которого
+    подстраивается по принципу AIMD. После успешных запросов темп растет на INCREASE_STEP,
+    после ответов 429 и ошибок сервера - уменьшается в DECREASE_FACTOR раз. Заголовок Retry-After
+    приостанавливает выдачу разрешений всем потокам на указанное время.
+    """
+
+    def __init__(self, initial_rate: float = INITIAL_RATE, min_rate: float = MIN_RATE, max_rate: float = MAX_RATE):
+        """
+        Конструктор класса.
+
+        Аргументы:
+            initial_rate (float): Начальный темп, запросов в секунду.
+            min_rate (float): Минимальный темп, запросов в секунду.
+            max_rate (float): Максимальный темп, запросов в секунду.
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self._rate = initial_rate
+        self._tokens = 1.0
+        self._updated_at = monotonic()
+        self._paused_until = 0.0
+        self._outcomes = deque(maxlen=ERROR_WINDOW)
+        self._lock = threading.Lock()
+        self.total_requests = 0
+        self.throttled_requests = 0
+        self.failed_requests = 0
+
+    @property
+    def effective_rate(self) -> float:
+        """
+        Текущий темп запросов, запросов в секунду.
+        """
+        return self._rate
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Доля ответов 429 и ошибок среди последних ERROR_WINDOW запросов.
+        """
+        with self._lock:
+            return self._error_rate()
+
+    def _error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def _refill(self, now: float) -> None:
+        # Емкость корзины - одна секунда запросов при текущем темпе
+        self._tokens = min(max(1.0, self._rate), self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def acquire(self) -> None:
+        """
+        Ожидает разрешения на выполнение очередного запроса.
+        """
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self.total_requests += 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self._rate
+            sleep(wait)
+
+    def on_success(self) -> None:
+        """
+        Учитывает успешный запрос: темп увеличивается, если доля ошибок невелика.
+        """
+        with self._lock:
+            self._outcomes.append(0)
+            if self._error_rate() < ERROR_RATE_THRESHOLD:
+                self._rate = min(self.max_rate, self._rate + INCREASE_STEP)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Учитывает ответ 429 или ошибку сервера: темп уменьшается, а при наличии Retry-After
+        выдача разрешений приостанавливается.
+
+        Аргументы:
+            retry_after (Optional[float]): Значение Retry-After в секундах.
+        """
+        with self._lock:
+            self._outcomes.append(1)
+            self.throttled_requests += 1
+            self._rate = max(self.min_rate, self._rate * DECREASE_FACTOR)
+            self._tokens = 0.0
+            if retry_after:
+                self._paused_until = max(self._paused_until, monotonic() + retry_after)
+
+    def on_failure(self) -> None:
+        """
+        Учитывает запрос, завершившийся сетевой ошибкой.
+        """
+        with self._lock:
+            self._outcomes.append(1)
+            self.failed_requests += 1
+            self._rate = max(self.min_rate, self._rate * DECREASE_FACTOR)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Возвращает текущие показатели ограничителя.
+
+        Возвращает:
+            Dict[str, float]: Темп, доля ошибок и счетчики запросов.
+        """
+        with self._lock:
+            return {
+                'effective_rate': round(self._rate, 2),
+                'error_rate': round(self._error_rate(), 3),
+                'total_requests': self.total_requests,
+                'throttled_requests': self.throttled_requests,
+                'failed_requests': self.failed_requests,
+            }
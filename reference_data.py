@@ -0,0 +1,116 @@
+import json
+import os
+from typing import Dict, Any, List
+
+# Файл с предварительно подготовленным снимком справочных данных
+SNAPSHOT_PATH = '.reference_snapshot.json'
+# ID региона "Россия" в справочнике hh.ru
+RUSSIA_ID = 113
+
+
+def _source_key(*paths: str) -> str:
+    """
+    Вычисляет ключ версии исходных файлов по их размеру и времени изменения.
+
+    Аргументы:
+        paths (str): Пути к исходным JSON-файлам.
+
+    Возвращает:
+        str: Ключ версии исходных файлов.
+    """
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}')
+    return ';'.join(parts)
+
+
+def build_reference_snapshot(areas_path: str, industries_path: str) -> Dict[str, Any]:
+    """
+    Разбирает файлы areas.json и industries.json за один проход и разворачивает дерево регионов
+    в плоские списки регионов и городов. Все вложенные населенные пункты любой глубины относятся
+    к региону верхнего уровня. Регион без вложенных населенных пунктов (Москва, Санкт-Петербург)
+    добавляется и как город.
+
+    Аргументы:
+        areas_path (str): Путь к JSON-файлу с деревом регионов.
+        industries_path (str): Путь к JSON-файлу с отраслями.
+
+    Возвращает:
+        Dict[str, Any]: Снимок справочных данных со списками 'regions', 'cities', 'industries' и 'industry_groups'.
+    """
+    with open(areas_path, 'r', encoding='utf-8') as areas_file:
+        areas_data = json.load(areas_file)
+    with open(industries_path, 'r', encoding='utf-8') as industries_file:
+        industries_data = json.load(industries_file)
+
+    regions = [(RUSSIA_ID, 'Россия')]
+    cities = [(RUSSIA_ID, 'Россия', RUSSIA_ID)]
+    for region in areas_data['areas']:
+        region_id = int(region['id'])
+        regions.append((region_id, region['name']))
+        if not region['areas']:
+            cities.append((region_id, region['name'], region_id))
+            continue
+        stack = list(region['areas'])
+        while stack:
+            area = stack.pop()
+            cities.append((int(area['id']), area['name'], region_id))
+            stack.extend(area.get('areas') or [])
+
+    industry_groups = [(group['id'], group['name']) for group in industries_data]
+    industries = [(industry['id'], industry['name'])
+                  for group in industries_data for industry in group.get('industries', [])]
+
+    return {
+        'source_key': _source_key(areas_path, industries_path),
+        'regions': regions,
+        'cities': cities,
+        'industries': industries,
+        'industry_groups': industry_groups,
+    }
+
+
+def load_reference_snapshot(areas_path: str, industries_path: str,
+                            snapshot_path: str = SNAPSHOT_PATH) -> Dict[str, Any]:
+    """
+    Возвращает снимок справочных данных. Снимок строится заново только при изменении исходных файлов,
+    в остальных случаях читается компактный файл снимка.
+
+    Аргументы:
+        areas_path (str): Путь к JSON-файлу с деревом регионов.
+        industries_path (str): Путь к JSON-файлу с отраслями.
+        snapshot_path (str, optional): Путь к файлу снимка. По умолчанию SNAPSHOT_PATH.
+
+    Возвращает:
+        Dict[str, Any]: Снимок справочных данных.
+    """
+    source_key = _source_key(areas_path, industries_path)
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as snapshot_file:
+            snapshot = json.load(snapshot_file)
+        if snapshot.get('source_key') == source_key:
+            return snapshot
+    except (OSError, ValueError):
+        pass
+
+    snapshot = build_reference_snapshot(areas_path, industries_path)
+    try:
+        with open(snapshot_path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(snapshot, snapshot_file, ensure_ascii=False, separators=(',', ':'))
+    except OSError as e:
+        print("Не удалось сохранить снимок справочных данных:", e)
+    return snapshot
+
+
+def region_names(snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Возвращает регионы верхнего уровня из снимка в формате элементов areas.json.
+
+    Аргументы:
+        snapshot (Dict[str, Any]): Снимок справочных данных.
+
+    Возвращает:
+        List[Dict[str, Any]]: Список словарей с ключами 'id' и 'name'.
+    """
+    return [{'id': region_id, 'name': name} for region_id, name in snapshot['regions'] if region_id != RUSSIA_ID]
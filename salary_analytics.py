@@ -0,0 +1,267 @@
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
+
+import psycopg2
+
+from database_manager import DatabaseManager
+
+# Границы интервалов гистограммы зарплат (руб.). Последний интервал открытый: от 1 000 000 и выше.
+SALARY_BUCKETS = ([step * 10_000 for step in range(0, 20)]
+                  + [200_000 + step * 25_000 for step in range(0, 12)]
+                  + [500_000 + step * 100_000 for step in range(0, 6)])
+# Значения industry_id в таблице salary_rollup, не соответствующие конкретной отрасли
+ALL_INDUSTRIES = -1
+UNKNOWN_INDUSTRY = 0
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+BUCKET_EXPRESSION = f"width_bucket(v.salary, ARRAY[{', '.join(map(str, SALARY_BUCKETS))}])"
+
+ROLLUP_INSERT_QUERY = f"""
+    INSERT INTO salary_rollup (region_id, industry_id, month, bucket, vacancy_count, salary_sum)
+    SELECT c.region_id, {ALL_INDUSTRIES}, date_trunc('month', v.published_at)::date, {BUCKET_EXPRESSION},
+           COUNT(*), SUM(v.salary)
+    FROM vacancies v
+    JOIN cities c ON v.city_id = c.city_id
+    {{cells_join}}
+    WHERE v.salary IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+    UNION ALL
+    SELECT c.region_id, COALESCE(ei.industry_id, {UNKNOWN_INDUSTRY}), date_trunc('month', v.published_at)::date,
+           {BUCKET_EXPRESSION}, COUNT(*), SUM(v.salary)
+    FROM vacancies v
+    JOIN cities c ON v.city_id = c.city_id
+    LEFT JOIN employer_industry ei ON ei.employer_id = v.employer_id
+    {{cells_join}}
+    WHERE v.salary IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+"""
+
+AFFECTED_CELLS_JOIN = """
+    JOIN affected_cells a ON a.region_id = c.region_id
+                         AND a.month = date_trunc('month', v.published_at)::date
+"""
+
+
+def bucket_bounds(bucket: int) -> Tuple[int, Optional[int]]:
+    """
+    Возвращает границы интервала гистограммы по его номеру (как у width_bucket).
+
+    Args:
+        bucket (int): Номер интервала.
+
+    Returns:
+        Tuple[int, Optional[int]]: Нижняя граница и верхняя граница (None для последнего открытого интервала).
+    """
+    upper = SALARY_BUCKETS[bucket] if bucket < len(SALARY_BUCKETS) else None
+    return SALARY_BUCKETS[bucket - 1], upper
+
+
+def percentile_from_histogram(histogram: Dict[int, Tuple[int, int]], fraction: float) -> Optional[float]:
+    """
+    Вычисляет перцентиль зарплаты по гистограмме с линейной интерполяцией внутри интервала.
+    Для последнего открытого интервала возвращается средняя зарплата в нем.
+
+    Args:
+        histogram (Dict[int, Tuple[int, int]]): Номер интервала -> (количество вакансий, сумма зарплат).
+        fraction (float): Доля от 0 до 1 (0.5 - медиана).
+
+    Returns:
+        Optional[float]: Значение перцентиля или None для пустой гистограммы.
+    """
+    total = sum(count for count, _ in histogram.values())
+    if not total:
+        return None
+    target = fraction * total
+    cumulative = 0
+    for bucket in sorted(histogram):
+        count, salary_sum = histogram[bucket]
+        if count and cumulative + count >= target:
+            lower, upper = bucket_bounds(bucket)
+            if upper is None:
+                return salary_sum / count
+            return lower + (upper - lower) * (target - cumulative) / count
+        cumulative += count
+    return None
+
+
+class SalaryAnalytics:
+    """
+    Класс для аналитики распределения зарплат в разрезе регионов, отраслей и месяцев.
+    Запросы обслуживаются из таблицы предварительно агрегированных гистограмм 'salary_rollup',
+    которая обновляется инкрементально после каждой загрузки вакансий.
+    Вакансия работодателя с несколькими отраслями учитывается в каждой из них, а в разрезе регионов
+    и месяцев используются строки с industry_id = ALL_INDUSTRIES, где каждая вакансия учтена один раз.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Конструктор класса.
+
+        Args:
+            db_manager (DatabaseManager): Менеджер базы данных.
+        """
+        self.db_manager = db_manager
+
+    def refresh_rollups(self, employer_ids: Optional[List[int]] = None) -> None:
+        """
+        Обновляет таблицу 'salary_rollup'. Если переданы ID работодателей, пересчитываются только
+        ячейки (регион, месяц), в которые попадают их вакансии, и ячейки из 'salary_rollup_dirty',
+        где вакансии были учтены до изменения города или даты публикации. Иначе таблица строится заново.
+
+        Args:
+            employer_ids (Optional[List[int]]): ID работодателей, вакансии которых были загружены.
+
+        Returns:
+            None
+        """
+        try:
+            with self.db_manager._get_connection() as conn, conn.cursor() as cursor:
+                if employer_ids:
+                    cursor.execute("""
+                        CREATE TEMP TABLE affected_cells ON COMMIT DROP AS
+                        SELECT DISTINCT c.region_id, date_trunc('month', v.published_at)::date AS month
+                        FROM vacancies v
+                        JOIN cities c ON v.city_id = c.city_id
+                        WHERE v.employer_id = ANY(%s) AND v.salary IS NOT NULL
+                        UNION
+                        SELECT region_id, month FROM salary_rollup_dirty
+                    """, (list(employer_ids),))
+                    cursor.execute("""
+                        DELETE FROM salary_rollup r
+                        USING affected_cells a
+                        WHERE r.region_id = a.region_id AND r.month = a.month
+                    """)
+                    cursor.execute(ROLLUP_INSERT_QUERY.format(cells_join=AFFECTED_CELLS_JOIN))
+                    cursor.execute("""
+                        DELETE FROM salary_rollup_dirty d
+                        USING affected_cells a
+                        WHERE d.region_id = a.region_id AND d.month = a.month
+                    """)
+                else:
+                    cursor.execute("TRUNCATE salary_rollup, salary_rollup_dirty")
+                    cursor.execute(ROLLUP_INSERT_QUERY.format(cells_join=''))
+            conn.commit()
+        except psycopg2.Error as e:
+            print("Ошибка при обновлении агрегатов зарплат:", e)
+
+    def _get_histograms(self, group_by: Optional[str], region_id: Optional[int] = None,
+                        industry_id: Optional[float] = None, month_from: Optional[date] = None,
+                        month_to: Optional[date] = None) -> Dict[Any, Dict[int, Tuple[int, int]]]:
+        """
+        Получает гистограммы зарплат из 'salary_rollup', сгруппированные по указанному измерению.
+
+        Args:
+            group_by (Optional[str]): 'region_id', 'industry_id', 'month' или None (одна общая гистограмма).
+            region_id (Optional[int]): Фильтр по региону.
+            industry_id (Optional[float]): Фильтр по отрасли.
+            month_from (Optional[date]): Начальный месяц (включительно).
+            month_to (Optional[date]): Конечный месяц (включительно).
+
+        Returns:
+            Dict[Any, Dict[int, Tuple[int, int]]]: Значение измерения -> гистограмма.
+        """
+        conditions = []
+        params = []
+        if industry_id is not None:
+            conditions.append("industry_id = %s")
+            params.append(industry_id)
+        elif group_by == 'industry_id':
+            conditions.append("industry_id <> %s")
+            params.append(ALL_INDUSTRIES)
+        else:
+            conditions.append("industry_id = %s")
+            params.append(ALL_INDUSTRIES)
+        if region_id is not None:
+            conditions.append("region_id = %s")
+            params.append(region_id)
+        if month_from:
+            conditions.append("month >= date_trunc('month', %s::date)")
+            params.append(month_from)
+        if month_to:
+            conditions.append("month <= %s")
+            params.append(month_to)
+        key = group_by or 'NULL'
+        query = f"""
+            SELECT {key}, bucket, SUM(vacancy_count), SUM(salary_sum)
+            FROM salary_rollup
+            WHERE {' AND '.join(conditions)}
+            GROUP BY 1, 2
+        """
+        histograms = {}
+        try:
+            with self.db_manager._get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(query, params)
+                for group, bucket, count, salary_sum in cursor.fetchall():
+                    histograms.setdefault(group, {})[bucket] = (int(count), int(salary_sum))
+        except psycopg2.Error as e:
+            print("Ошибка при получении агрегатов зарплат:", e)
+        return histograms
+
+    def _get_names(self, group_by: str) -> Dict[Any, str]:
+        """
+        Получает названия значений измерения (регионов или отраслей).
+
+        Args:
+            group_by (str): 'region_id' или 'industry_id'.
+
+        Returns:
+            Dict[Any, str]: Значение измерения -> название.
+        """
+        queries = {
+            'region_id': "SELECT region_id, region_name FROM regions",
+            'industry_id': "SELECT id_industry, name_industry FROM industries",
+        }
+        if group_by not in queries:
+            return {}
+        try:
+            with self.db_manager._get_connection() as conn, conn.cursor() as cursor:
+                cursor.execute(queries[group_by])
+                return dict(cursor.fetchall())
+        except psycopg2.Error as e:
+            print("Ошибка при получении справочных данных:", e)
+            return {}
+
+    def get_distribution(self, group_by: str, **filters) -> List[Dict[str, Any]]:
+        """
+        Получает распределение зарплат (количество вакансий, средняя зарплата, перцентили) в разрезе измерения.
+
+        Args:
+            group_by (str): 'region_id', 'industry_id' или 'month'.
+            **filters: Фильтры region_id, industry_id, month_from, month_to.
+
+        Returns:
+            List[Dict[str, Any]]: Список словарей с ключами 'key', 'name', 'count', 'avg' и 'p25', 'p50', 'p75', 'p90',
+            отсортированный по убыванию количества вакансий (для месяцев - по месяцу).
+        """
+        names = self._get_names(group_by)
+        distribution = []
+        for group, histogram in self._get_histograms(group_by, **filters).items():
+            count = sum(bucket_count for bucket_count, _ in histogram.values())
+            salary_sum = sum(bucket_sum for _, bucket_sum in histogram.values())
+            if group_by == 'industry_id' and group == UNKNOWN_INDUSTRY:
+                name = "Отрасль не указана"
+            else:
+                name = names.get(group, str(group))
+            row = {'key': group, 'name': name, 'count': count, 'avg': round(salary_sum / count)}
+            for fraction in PERCENTILES:
+                row[f'p{round(fraction * 100)}'] = round(percentile_from_histogram(histogram, fraction))
+            distribution.append(row)
+        if group_by == 'month':
+            distribution.sort(key=lambda row: row['key'])
+        else:
+            distribution.sort(key=lambda row: row['count'], reverse=True)
+        return distribution
+
+    def get_histogram(self, **filters) -> List[Tuple[int, Optional[int], int]]:
+        """
+        Получает гистограмму зарплат с учетом фильтров.
+
+        Args:
+            **filters: Фильтры region_id, industry_id, month_from, month_to.
+
+        Returns:
+            List[Tuple[int, Optional[int], int]]: Список (нижняя граница, верхняя граница, количество вакансий).
+        """
+        histogram = self._get_histograms(None, **filters).get(None, {})
+        return [(*bucket_bounds(bucket), histogram[bucket][0]) for bucket in sorted(histogram)]
+
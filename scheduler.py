@@ -0,0 +1,304 @@
+import argparse
+import math
+import os
+import signal
+import threading
+from collections import defaultdict
+from time import monotonic
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from bootstrap import Bootstrap
+from config import AREAS, INDUSTRIES, MAX_POPULATION, USER_AGENT
+from database_manager import DatabaseManager
+from hh_api_client import HeadHunterAPI, MAX_DEPTH, PER_PAGE
+from http_transport import HttpTransport
+from rate_controller import AdaptiveRateController
+from salary_analytics import SalaryAnalytics
+
+# Границы интервала между обновлениями: активные работодатели обновляются раз в час, неактивные - раз в неделю
+MIN_REFRESH_INTERVAL = 3600
+MAX_REFRESH_INTERVAL = 7 * 24 * 3600
+# Сколько изменений вакансий работодателя должно накопиться к следующему обновлению
+TARGET_CHANGES = 5
+# Вес последнего замера в сглаженной изменчивости
+CHURN_SMOOTHING = 0.5
+# Бюджет запросов к API на одно окно и длительность окна, сек.
+REQUEST_BUDGET = 1000
+BUDGET_WINDOW = 3600
+# На сколько равных шагов делится окно бюджета: к концу каждого шага доступна очередная доля бюджета,
+# поэтому запросы распределяются по всему окну, а не расходуются в его начале
+PACING_STEPS = 12
+# Как часто обновляются курсы валют, сек.
+CURRENCIES_TTL = 24 * 3600
+# Максимальная пауза между проверками расписания: за это время могут появиться новые отслеживаемые работодатели
+MAX_SLEEP = 15 * 60
+
+
+def refresh_interval(churn_rate: float) -> float:
+    """
+    Вычисляет интервал до следующего обновления работодателя: время, за которое при текущей изменчивости
+    накопится TARGET_CHANGES изменений, в пределах от MIN_REFRESH_INTERVAL до MAX_REFRESH_INTERVAL.
+
+    Аргументы:
+        churn_rate (float): Изменчивость - количество новых, измененных и закрытых вакансий в час.
+
+    Возвращает:
+        float: Интервал в секундах.
+    """
+    if churn_rate <= 0:
+        return MAX_REFRESH_INTERVAL
+    return min(MAX_REFRESH_INTERVAL, max(MIN_REFRESH_INTERVAL, TARGET_CHANGES / churn_rate * 3600))
+
+
+def estimate_requests(open_vacancies: int, area_groups: int) -> int:
+    """
+    Оценивает количество запросов к API для обновления вакансий одного работодателя.
+
+    Аргументы:
+        open_vacancies (int): Количество вакансий работодателя при прошлом обновлении.
+        area_groups (int): Количество групп регионов, по которым делится запрос крупного работодателя.
+
+    Возвращает:
+        int: Ожидаемое количество запросов.
+    """
+    pages = max(1, math.ceil(open_vacancies / PER_PAGE))
+    if open_vacancies > MAX_DEPTH:
+        # Крупный работодатель: пробные запросы по группам регионов
+        pages += area_groups
+    return pages
+
+
+class RefreshScheduler:
+    """
+    Фоновое обновление вакансий отслеживаемых работодателей (таблица 'tracked_employers').
+    Каждый работодатель обновляется по своему расписанию: интервал зависит от наблюдаемой изменчивости
+    его вакансий в абсолютных числах, поэтому крупные и активные работодатели обновляются чаще.
+    Выбранные к обновлению работодатели укладываются в общий бюджет запросов, небольшие объединяются
+    в общие запросы по ранее известному количеству вакансий, без пробных запросов.
+    Менеджер базы данных и клиент API создаются один раз и используются все время работы.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, hh_api: HeadHunterAPI, bootstrap: Bootstrap,
+                 analytics: SalaryAnalytics, request_budget: int = REQUEST_BUDGET):
+        """
+        Конструктор класса.
+
+        Аргументы:
+            db_manager (DatabaseManager): Менеджер базы данных.
+            hh_api (HeadHunterAPI): Клиент API hh.ru.
+            bootstrap (Bootstrap): Подготовка базы данных и справочных данных (уже запущенная).
+            analytics (SalaryAnalytics): Агрегаты зарплат.
+            request_budget (int): Количество запросов к API на окно BUDGET_WINDOW.
+        """
+        self.db_manager = db_manager
+        self.hh_api = hh_api
+        self.bootstrap = bootstrap
+        self.analytics = analytics
+        self.request_budget = request_budget
+        self._window_started = monotonic()
+        self._window_requests = hh_api.rate_controller.total_requests
+        self._currencies = None
+        self._currencies_updated = 0.0
+        self._stop = threading.Event()
+
+    def stop(self, *args) -> None:
+        """
+        Останавливает обработку после завершения текущего цикла обновления.
+        """
+        self._stop.set()
+
+    def _remaining_budget(self) -> int:
+        """
+        Возвращает количество запросов, доступное сейчас: долю бюджета окна, соответствующую прошедшим
+        шагам окна (включая текущий), за вычетом уже выполненных в окне запросов.
+        """
+        elapsed = monotonic() - self._window_started
+        if elapsed >= BUDGET_WINDOW:
+            self._window_started = monotonic()
+            self._window_requests = self.hh_api.rate_controller.total_requests
+            elapsed = 0.0
+        steps = min(PACING_STEPS, int(elapsed // (BUDGET_WINDOW / PACING_STEPS)) + 1)
+        allowance = self.request_budget * steps // PACING_STEPS
+        return allowance - (self.hh_api.rate_controller.total_requests - self._window_requests)
+
+    def _seconds_to_more_budget(self) -> float:
+        """
+        Возвращает время до следующего шага окна бюджета, когда станет доступна очередная доля бюджета.
+        Последний шаг заканчивается вместе с окном.
+        """
+        step = BUDGET_WINDOW / PACING_STEPS
+        elapsed = monotonic() - self._window_started
+        if elapsed >= BUDGET_WINDOW:
+            return 0.0
+        return (elapsed // step + 1) * step - elapsed
+
+    def _get_currencies(self) -> Dict[str, float]:
+        """
+        Возвращает курсы валют, обновляя их раз в CURRENCIES_TTL.
+        """
+        if self._currencies is None:
+            self._currencies = self.bootstrap.currencies
+            self._currencies_updated = monotonic()
+        elif monotonic() - self._currencies_updated >= CURRENCIES_TTL:
+            from utils import fetch_currency_data
+
+            self._currencies = fetch_currency_data(self.hh_api.user_agent, self.hh_api.transport) or self._currencies
+            self._currencies_updated = monotonic()
+        return self._currencies
+
+    def _select(self, due: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        """
+        Выбирает работодателей для обновления в порядке очереди, пока их оценочная стоимость укладывается в бюджет.
+        Первый в очереди работодатель выбирается при полном бюджете окна (в последнем шаге окна,
+        если запросов в нем еще не было), даже если его стоимость больше бюджета.
+
+        Аргументы:
+            due (List[Dict[str, Any]]): Работодатели, для которых подошло время обновления.
+            budget (int): Доступное количество запросов.
+
+        Возвращает:
+            List[Dict[str, Any]]: Выбранные работодатели.
+        """
+        area_groups = len(self.bootstrap.areas_data)
+        selected = []
+        for employer in due:
+            cost = estimate_requests(employer['open_vacancies'], area_groups)
+            if cost <= budget or (not selected and budget >= self.request_budget):
+                selected.append(employer)
+                budget -= cost
+        return selected
+
+    def run_cycle(self) -> int:
+        """
+        Обновляет вакансии работодателей, для которых подошло время, в пределах оставшегося бюджета,
+        пересчитывает их изменчивость и планирует следующее обновление.
+
+        Возвращает:
+            int: Количество обновленных работодателей.
+        """
+        due = self.db_manager.get_due_tracked_employers()
+        budget = self._remaining_budget()
+        selected = self._select(due, budget) if budget > 0 else []
+        if not selected:
+            return 0
+
+        # Неактивных работодателей считаем небольшими, чтобы проверить их в общих запросах
+        found_by_employer = {employer['employer_id']: max(1, employer['open_vacancies']) for employer in selected}
+        self.hh_api.fetch_vacancies_by_estimates(self.bootstrap.areas_data, found_by_employer)
+        vacancies_by_employer = defaultdict(list)
+        for vacancy in self.hh_api.all_vacancies:
+            vacancies_by_employer[vacancy.employer_id].append(vacancy)
+        failed_ids = self.hh_api.failed_employer_ids()
+        self.hh_api.all_vacancies.clear()
+        self.hh_api.seen_employers.clear()
+        self.hh_api.failed_partitions.clear()
+
+        currencies = self._get_currencies()
+        schedule = []
+        refreshed = []
+        for employer in selected:
+            if employer['employer_id'] in failed_ids:
+                # Вакансии получены не полностью: не загружаем их и не закрываем отсутствующие,
+                # чтобы не исказить изменчивость, и повторяем позже
+                schedule.append((employer['employer_id'], None, None, MIN_REFRESH_INTERVAL))
+                continue
+            vacancies = vacancies_by_employer.get(employer['employer_id'], [])
+            stats = self.db_manager.fill_vacancies(vacancies, currencies) if vacancies else \
+                {'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+            refreshed.append((employer, stats))
+
+        # Закрытые вакансии - открытые в базе, но не пришедшие сейчас: отмечаем их архивными
+        refreshed_ids = [employer['employer_id'] for employer, _ in refreshed]
+        closed_by_employer = self.db_manager.archive_missing_vacancies(
+            refreshed_ids, [vacancy.vacancy_id for employer_id in refreshed_ids
+                            for vacancy in vacancies_by_employer.get(employer_id, [])])
+        changed_ids = []
+        for employer, stats in refreshed:
+            open_vacancies = stats['inserted'] + stats['updated'] + stats['unchanged']
+            changes = stats['inserted'] + stats['updated'] + closed_by_employer.get(employer['employer_id'], 0)
+            if stats['inserted'] or stats['updated']:
+                # Агрегаты зарплат учитывают и архивные вакансии, поэтому закрытие их не меняет
+                changed_ids.append(employer['employer_id'])
+
+            if employer['hours_since_refresh'] is None:
+                # Первое обновление только фиксирует текущие вакансии, изменчивость измеряется со следующего
+                churn_rate = 0.0
+                interval = MIN_REFRESH_INTERVAL
+            else:
+                observed = changes / max(employer['hours_since_refresh'], MIN_REFRESH_INTERVAL / 3600)
+                churn_rate = CHURN_SMOOTHING * observed + (1 - CHURN_SMOOTHING) * employer['churn_rate']
+                interval = refresh_interval(churn_rate)
+            schedule.append((employer['employer_id'], open_vacancies, churn_rate, interval))
+
+        self.db_manager.save_refresh_schedule(schedule)
+        if changed_ids:
+            self.analytics.refresh_rollups(changed_ids)
+        print(f"Обновлено {len(selected) - len(failed_ids)} из {len(due)} ожидающих "
+              f"работодателей, с изменениями: {len(changed_ids)}, с ошибками: {len(failed_ids)}. "
+              f"Доступно запросов: {self._remaining_budget()}, "
+              f"темп {self.hh_api.rate_controller.effective_rate:.1f} запросов/с")
+        return len(selected)
+
+    def run(self) -> None:
+        """
+        Выполняет циклы обновления до остановки. Между циклами ожидает ближайшего запланированного обновления.
+        Если после цикла остались ожидающие работодатели или бюджет исчерпан, дополнительно ожидает следующего
+        шага окна бюджета. Пауза не превышает MAX_SLEEP.
+
+        Returns:
+            None
+        """
+        print("Планировщик обновлений запущен.")
+        while not self._stop.is_set():
+            try:
+                self.run_cycle()
+            except Exception as e:
+                print("Ошибка при обновлении отслеживаемых работодателей:", e)
+
+            wait = self.db_manager.get_seconds_to_next_refresh()
+            if wait is None:
+                wait = MAX_SLEEP
+            elif wait <= 0 or self._remaining_budget() <= 0:
+                # Работодатели, для которых подошло время, не уложились в доступный бюджет
+                wait = max(wait, self._seconds_to_more_budget())
+            self._stop.wait(min(MAX_SLEEP, max(1.0, wait)))
+        print("Планировщик обновлений остановлен.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Фоновое обновление вакансий отслеживаемых работодателей.")
+    parser.add_argument('--track', type=int, nargs='+', default=[],
+                        help="ID работодателей hh.ru, которые нужно добавить в отслеживаемые")
+    parser.add_argument('--budget', type=int, default=REQUEST_BUDGET,
+                        help=f"количество запросов к API за {BUDGET_WINDOW // 60} минут")
+    args = parser.parse_args()
+
+    load_dotenv()
+    transport = HttpTransport(USER_AGENT)
+    hh_api = HeadHunterAPI(USER_AGENT, transport, AdaptiveRateController())
+    db_manager = DatabaseManager(os.getenv('DB_HOST'), os.getenv('DB_NAME'), os.getenv('DB_USER'),
+                                 os.getenv('DB_PASSWORD'))
+    bootstrap = Bootstrap(db_manager, transport, AREAS, INDUSTRIES, MAX_POPULATION, USER_AGENT)
+    bootstrap.start()
+
+    if args.track:
+        # Работодателей, которых еще нет в базе, сначала регистрируем
+        new_ids = sorted(set(args.track) - db_manager.get_existing_employer_ids(args.track))
+        if new_ids:
+            bootstrap.wait_reference_data()
+            db_manager.fill_employers_from_info(hh_api.fetch_company_info(new_ids))
+        db_manager.track_employers(args.track)
+
+    scheduler = RefreshScheduler(db_manager, hh_api, bootstrap, SalaryAnalytics(db_manager), args.budget)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    try:
+        scheduler.run()
+    finally:
+        transport.close()
+
+
+if __name__ == "__main__":
+    main()
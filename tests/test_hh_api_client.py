@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import hh_api_client
+from hh_api_client import HeadHunterAPI, MAX_DEPTH, plan_employer_batches
+from rate_controller import AdaptiveRateController
+
+
+def test_batches_respect_depth_and_employer_limits():
+    found = {employer_id: 100 for employer_id in range(1, 51)}
+    batches, large = plan_employer_batches(found, max_depth=1000, max_employers=8)
+    assert large == []
+    assert sorted(employer_id for batch in batches for employer_id in batch) == list(range(1, 51))
+    for batch in batches:
+        assert len(batch) <= 8
+        assert sum(found[employer_id] for employer_id in batch) <= 1000
+
+
+def test_batches_first_fit_decreasing():
+    batches, large = plan_employer_batches({1: 900, 2: 600, 3: 500, 4: 400, 5: 100}, max_depth=1000)
+    assert large == []
+    assert batches == [[1, 5], [2, 4], [3]]
+
+
+def test_batches_skip_empty_and_separate_large():
+    batches, large = plan_employer_batches({1: 0, 2: 2500, 3: 1801, 4: 10})
+    assert large == [2, 3]
+    assert batches == [[4]]
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'{}'):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+
+class FakeTransport:
+    """
+    Имитация /vacancies: вакансии работодателей распределены по регионам 1-3,
+    поддерживаются фильтры employer_id и area и постраничная выдача.
+    """
+
+    def __init__(self, vacancies_by_employer, fail_pages=()):
+        self.vacancies_by_employer = vacancies_by_employer
+        self.fail_pages = set(fail_pages)
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append(params)
+        employer_ids = params['employer_id'] if isinstance(params['employer_id'], list) else [params['employer_id']]
+        if (tuple(employer_ids), params['page']) in self.fail_pages:
+            return FakeResponse(503)
+        area = params.get('area')
+        areas = area if isinstance(area, list) else [area]
+        items = []
+        for employer_id in employer_ids:
+            for index in range(self.vacancies_by_employer.get(employer_id, 0)):
+                region_id = index % 3 + 1
+                if area != hh_api_client.RUSSIA_ID and region_id not in areas:
+                    continue
+                items.append({'id': str(employer_id * 100_000 + index), 'name': 'Вакансия',
+                              'area': {'id': str(region_id)}, 'published_at': '2026-10-01T10:00:00+0300',
+                              'alternate_url': 'https://hh.ru/vacancy/1',
+                              'employer': {'id': str(employer_id), 'name': 'Работодатель'}})
+        page, per_page = params['page'], params['per_page']
+        body = {'found': len(items), 'items': items[page * per_page:(page + 1) * per_page][:MAX_DEPTH]}
+        return FakeResponse(200, json.dumps(body).encode())
+
+
+@pytest.fixture
+def make_api(monkeypatch):
+    monkeypatch.setattr(hh_api_client, 'sleep', lambda seconds: None)
+
+    def make(transport):
+        return HeadHunterAPI('test', transport, AdaptiveRateController(initial_rate=1e6, max_rate=1e6))
+    return make
+
+
+@pytest.mark.parametrize('estimate', [0, 1, 1900, MAX_DEPTH, 5000])
+def test_stale_estimate_does_not_truncate_large_employer(make_api, estimate):
+    transport = FakeTransport({1: 5000, 2: 30})
+    api = make_api(transport)
+    api.fetch_vacancies_by_estimates([[1, 2], [3]], {1: max(1, estimate), 2: 30})
+    counts = {}
+    for vacancy in api.all_vacancies:
+        counts[vacancy.employer_id] = counts.get(vacancy.employer_id, 0) + 1
+    assert counts == {1: 5000, 2: 30}
+    assert len({vacancy.vacancy_id for vacancy in api.all_vacancies}) == 5030
+
+
+def test_overflowing_batch_is_not_paged_further(make_api):
+    transport = FakeTransport({1: 3000, 2: 20})
+    api = make_api(transport)
+    api.fetch_vacancies_by_estimates([[1, 2], [3]], {1: 10, 2: 20})
+    assert len(api.all_vacancies) == 3020
+    batch_pages = [params['page'] for params in transport.requests
+                   if isinstance(params['employer_id'], list) and len(params['employer_id']) == 2]
+    assert batch_pages == [0]
+
+
+def test_failed_page_is_reported_without_partial_vacancies(make_api):
+    transport = FakeTransport({1: 150, 2: 30}, fail_pages={((1, 2), 1)})
+    api = make_api(transport)
+    api.fetch_vacancies_by_estimates([[1, 2], [3]], {1: 150, 2: 30})
+    assert api.all_vacancies == []
+    assert api.failed_employer_ids() == {1, 2}
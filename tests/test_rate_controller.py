@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import rate_controller
+from rate_controller import AdaptiveRateController, parse_retry_after
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after('-5') == 0.0
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(30, abs=2)
+
+
+@pytest.mark.parametrize('value', [None, '', 'soon'])
+def test_parse_retry_after_missing_or_invalid(value):
+    assert parse_retry_after(value) is None
+
+
+def test_throttle_halves_rate_down_to_minimum():
+    controller = AdaptiveRateController(initial_rate=2.0, min_rate=0.5)
+    controller.on_throttle()
+    assert controller.effective_rate == 1.0
+    controller.on_throttle()
+    controller.on_throttle()
+    assert controller.effective_rate == 0.5
+    assert controller.stats()['throttled_requests'] == 3
+
+
+def test_success_increases_rate_only_when_errors_are_rare():
+    controller = AdaptiveRateController(initial_rate=1.0, max_rate=1.1)
+    controller.on_success()
+    assert controller.effective_rate == pytest.approx(1.0 + rate_controller.INCREASE_STEP)
+    controller.on_success()
+    controller.on_success()
+    assert controller.effective_rate == 1.1
+
+    controller = AdaptiveRateController(initial_rate=1.0)
+    controller.on_failure()
+    controller.on_success()
+    assert controller.error_rate == 0.5
+    assert controller.effective_rate == 0.5
+
+
+def test_retry_after_pauses_acquire(monkeypatch):
+    clock = [100.0]
+    sleeps = []
+    monkeypatch.setattr(rate_controller, 'monotonic', lambda: clock[0])
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+    monkeypatch.setattr(rate_controller, 'sleep', fake_sleep)
+
+    controller = AdaptiveRateController(initial_rate=10.0)
+    controller.on_throttle(retry_after=5)
+    controller.acquire()
+    assert sleeps[0] == pytest.approx(5)
+    assert controller.total_requests == 1
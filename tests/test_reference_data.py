@@ -0,0 +1,69 @@
+import json
+
+from reference_data import RUSSIA_ID, build_reference_snapshot
+
+AREAS = {
+    'id': str(RUSSIA_ID),
+    'name': 'Россия',
+    'areas': [
+        {'id': '1', 'name': 'Москва', 'areas': []},
+        {'id': '1620', 'name': 'Республика Марий Эл', 'areas': [
+            {'id': '1624', 'name': 'Йошкар-Ола', 'areas': []},
+            {'id': '1625', 'name': 'Волжский район', 'areas': [
+                {'id': '7001', 'name': 'Приволжский', 'areas': []},
+            ]},
+        ]},
+    ],
+}
+INDUSTRIES = [
+    {'id': '7', 'name': 'Информационные технологии', 'industries': [
+        {'id': '7.540', 'name': 'Разработка программного обеспечения'},
+        {'id': '7.541', 'name': 'Системная интеграция'},
+    ]},
+    {'id': '9', 'name': 'Телекоммуникации', 'industries': []},
+]
+
+
+def build(tmp_path):
+    areas_path = tmp_path / 'areas.json'
+    industries_path = tmp_path / 'industries.json'
+    areas_path.write_text(json.dumps(AREAS, ensure_ascii=False), encoding='utf-8')
+    industries_path.write_text(json.dumps(INDUSTRIES, ensure_ascii=False), encoding='utf-8')
+    return build_reference_snapshot(str(areas_path), str(industries_path))
+
+
+def test_regions_are_top_level_areas(tmp_path):
+    snapshot = build(tmp_path)
+    assert snapshot['regions'] == [(RUSSIA_ID, 'Россия'), (1, 'Москва'), (1620, 'Республика Марий Эл')]
+
+
+def test_nested_cities_belong_to_top_level_region(tmp_path):
+    cities = {city_id: (name, region_id) for city_id, name, region_id in build(tmp_path)['cities']}
+    assert cities[1624] == ('Йошкар-Ола', 1620)
+    assert cities[1625] == ('Волжский район', 1620)
+    assert cities[7001] == ('Приволжский', 1620)
+
+
+def test_region_without_children_is_also_a_city(tmp_path):
+    cities = {city_id: (name, region_id) for city_id, name, region_id in build(tmp_path)['cities']}
+    assert cities[1] == ('Москва', 1)
+    assert 1620 not in cities
+    assert cities[RUSSIA_ID] == ('Россия', RUSSIA_ID)
+
+
+def test_city_ids_are_unique(tmp_path):
+    city_ids = [city_id for city_id, _, _ in build(tmp_path)['cities']]
+    assert len(city_ids) == len(set(city_ids))
+
+
+def test_industries_are_flattened(tmp_path):
+    snapshot = build(tmp_path)
+    assert snapshot['industry_groups'] == [('7', 'Информационные технологии'), ('9', 'Телекоммуникации')]
+    assert snapshot['industries'] == [('7.540', 'Разработка программного обеспечения'),
+                                      ('7.541', 'Системная интеграция')]
+
+
+def test_repository_reference_files_have_unique_city_ids():
+    snapshot = build_reference_snapshot('areas.json', 'industries.json')
+    city_ids = [city_id for city_id, _, _ in snapshot['cities']]
+    assert len(city_ids) == len(set(city_ids))
@@ -0,0 +1,32 @@
+import pytest
+
+from salary_analytics import SALARY_BUCKETS, bucket_bounds, percentile_from_histogram
+
+
+def test_bucket_bounds_edges():
+    assert bucket_bounds(1) == (0, 10_000)
+    assert bucket_bounds(len(SALARY_BUCKETS)) == (SALARY_BUCKETS[-1], None)
+
+
+def test_percentile_of_empty_histogram():
+    assert percentile_from_histogram({}, 0.5) is None
+    assert percentile_from_histogram({3: (0, 0)}, 0.5) is None
+
+
+def test_percentile_interpolates_inside_first_bucket():
+    histogram = {1: (10, 50_000)}
+    assert percentile_from_histogram(histogram, 0.5) == pytest.approx(5_000)
+    assert percentile_from_histogram(histogram, 1.0) == pytest.approx(10_000)
+
+
+def test_percentile_of_last_open_bucket_is_its_mean():
+    last = len(SALARY_BUCKETS)
+    histogram = {1: (1, 5_000), last: (3, 4_500_000)}
+    assert percentile_from_histogram(histogram, 0.9) == pytest.approx(1_500_000)
+
+
+def test_percentile_skips_empty_buckets():
+    histogram = {2: (0, 0), 5: (4, 180_000)}
+    lower, upper = bucket_bounds(5)
+    assert percentile_from_histogram(histogram, 0.0) == pytest.approx(lower)
+    assert percentile_from_histogram(histogram, 0.25) == pytest.approx(lower + (upper - lower) / 4)
@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+from scheduler import (BUDGET_WINDOW, CHURN_SMOOTHING, MAX_REFRESH_INTERVAL, MIN_REFRESH_INTERVAL, PACING_STEPS,
+                       REQUEST_BUDGET, TARGET_CHANGES, RefreshScheduler, estimate_requests, refresh_interval)
+
+
+class FakeDatabase:
+    def __init__(self, due, stats, closed):
+        self.due = due
+        self.stats = stats
+        self.closed = closed
+        self.archive_calls = []
+        self.schedule = None
+
+    def get_due_tracked_employers(self):
+        return self.due
+
+    def fill_vacancies(self, vacancies, currencies):
+        return self.stats[vacancies[0].employer_id]
+
+    def archive_missing_vacancies(self, employer_ids, open_vacancy_ids):
+        self.archive_calls.append((sorted(employer_ids), sorted(open_vacancy_ids)))
+        return self.closed
+
+    def save_refresh_schedule(self, schedule):
+        self.schedule = {row[0]: row[1:] for row in schedule}
+
+
+class FakeApi:
+    def __init__(self, vacancies, failed_ids):
+        self.vacancies = vacancies
+        self.failed_ids = failed_ids
+        self.all_vacancies = []
+        self.seen_employers = set()
+        self.failed_partitions = []
+        self.rate_controller = SimpleNamespace(total_requests=0, effective_rate=1.0)
+
+    def fetch_vacancies_by_estimates(self, areas_data, found_by_employer):
+        self.all_vacancies.extend(self.vacancies)
+
+    def failed_employer_ids(self):
+        return self.failed_ids
+
+
+def make_scheduler(db, api):
+    bootstrap = SimpleNamespace(areas_data=[{}], currencies={'RUR': 1})
+    return RefreshScheduler(db, api, bootstrap, SimpleNamespace(refresh_rollups=lambda ids: None))
+
+
+def test_dormant_employer_refreshes_weekly():
+    assert refresh_interval(0) == MAX_REFRESH_INTERVAL
+    assert refresh_interval(0.001) == MAX_REFRESH_INTERVAL
+
+
+def test_hot_employer_refreshes_hourly():
+    assert refresh_interval(1000) == MIN_REFRESH_INTERVAL
+
+
+def test_interval_waits_for_target_changes():
+    assert refresh_interval(TARGET_CHANGES / 10) == 10 * 3600
+
+
+def test_estimate_requests():
+    assert estimate_requests(0, 10) == 1
+    assert estimate_requests(250, 10) == 3
+    assert estimate_requests(5000, 10) == 60
+
+
+def test_run_cycle_counts_open_and_closed_vacancies():
+    due = [{'employer_id': 1, 'open_vacancies': 10, 'churn_rate': 0.0, 'hours_since_refresh': 2.0},
+           {'employer_id': 2, 'open_vacancies': 5, 'churn_rate': 1.0, 'hours_since_refresh': 2.0}]
+    vacancies = [SimpleNamespace(vacancy_id=vacancy_id, employer_id=employer_id)
+                 for vacancy_id, employer_id in [(11, 1), (12, 1), (13, 1), (21, 2)]]
+    db = FakeDatabase(due, {1: {'inserted': 1, 'updated': 0, 'unchanged': 1, 'rejected': 1}}, {1: 3})
+    scheduler = make_scheduler(db, FakeApi(vacancies, {2}))
+
+    assert scheduler.run_cycle() == 2
+    # Вакансии работодателя с ошибкой не загружаются и не закрываются
+    assert db.archive_calls == [([1], [11, 12, 13])]
+    open_vacancies, churn_rate, interval = db.schedule[1]
+    assert open_vacancies == 2
+    assert churn_rate == CHURN_SMOOTHING * (1 + 3) / 2.0
+    assert db.schedule[2] == (None, None, MIN_REFRESH_INTERVAL)
+
+
+def test_budget_is_paced_across_window(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('scheduler.monotonic', lambda: now[0])
+    api = FakeApi([], set())
+    scheduler = make_scheduler(FakeDatabase([], {}, {}), api)
+    step = BUDGET_WINDOW / PACING_STEPS
+
+    assert scheduler._remaining_budget() == REQUEST_BUDGET // PACING_STEPS
+    api.rate_controller.total_requests = REQUEST_BUDGET // PACING_STEPS
+    assert scheduler._remaining_budget() == 0
+    assert scheduler._seconds_to_more_budget() == step
+
+    now[0] = step + 10
+    assert scheduler._remaining_budget() == 2 * REQUEST_BUDGET // PACING_STEPS - api.rate_controller.total_requests
+    assert scheduler._seconds_to_more_budget() == step - 10
+
+    now[0] = BUDGET_WINDOW
+    assert scheduler._remaining_budget() == REQUEST_BUDGET // PACING_STEPS
+
+
+def test_run_waits_for_budget_when_due_employers_remain(monkeypatch):
+    monkeypatch.setattr('scheduler.monotonic', lambda: 0.0)
+    db = FakeDatabase([], {}, {})
+    db.get_seconds_to_next_refresh = lambda: 0.0
+    scheduler = make_scheduler(db, FakeApi([], set()))
+    waits = []
+
+    def fake_wait(seconds):
+        waits.append(seconds)
+        scheduler.stop()
+
+    monkeypatch.setattr(scheduler._stop, 'wait', fake_wait)
+    scheduler.run()
+    assert waits == [BUDGET_WINDOW / PACING_STEPS]
@@ -0,0 +1,15 @@
+from utils import normalize_company_name
+
+
+def test_normalize_company_name_drops_legal_form_and_punctuation():
+    assert normalize_company_name('ООО "Рога и Копыта"') == 'рога и копыта'
+    assert normalize_company_name('ПАО «Сбербанк»') == 'сбербанк'
+
+
+def test_normalize_company_name_replaces_yo():
+    assert normalize_company_name('Ёлка-Телеком') == 'елка телеком'
+
+
+def test_normalize_company_name_keeps_legal_form_inside_words():
+    assert normalize_company_name('АО Аошка') == 'аошка'
+    assert normalize_company_name('ао') == ''
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+import vacancy_record
+from vacancy_record import VacancyRecord, decode_vacancies_page
+
+VACANCIES = [
+    {'id': '101', 'name': 'Разработчик', 'area': {'id': '1', 'name': 'Москва'},
+     'salary': {'from': 150000, 'to': None, 'currency': 'RUR', 'gross': True},
+     'published_at': '2026-10-01T10:00:00+0300', 'archived': False,
+     'address': {'raw': 'Москва, Тверская, 1'}, 'employer': {'id': '15478', 'name': 'VK'},
+     'alternate_url': 'https://hh.ru/vacancy/101', 'snippet': {'requirement': 'Python'}},
+    {'id': '102', 'name': 'Аналитик', 'area': {'id': '2'}, 'salary': None,
+     'published_at': '2026-10-02T10:00:00+0300', 'address': None, 'employer': {},
+     'alternate_url': 'https://hh.ru/vacancy/102'},
+    {'id': '103', 'name': 'Тестировщик', 'area': {'id': '1'},
+     'salary': {'from': 1500.5, 'to': 2500, 'currency': 'USD', 'gross': None},
+     'published_at': '2026-10-03T10:00:00+0300', 'archived': True,
+     'employer': {'id': '1740', 'name': 'Яндекс'}, 'alternate_url': 'https://hh.ru/vacancy/103'},
+]
+PAGE = json.dumps({'found': 3, 'items': VACANCIES}, ensure_ascii=False).encode()
+
+
+def test_from_dict():
+    record = VacancyRecord.from_dict(VACANCIES[0])
+    assert record == VacancyRecord(101, 'Разработчик', 1, 150000, None, 'RUR', True, '2026-10-01T10:00:00+0300',
+                                   False, 'Москва, Тверская, 1', 15478, 'VK', 'https://hh.ru/vacancy/101')
+    empty = VacancyRecord.from_dict(VACANCIES[1])
+    assert (empty.salary_from, empty.currency, empty.address, empty.employer_id, empty.archived) == \
+           (None, None, None, None, False)
+
+
+def test_content_hash_ignores_employer_name_and_salary_type():
+    record = VacancyRecord.from_dict(VACANCIES[0])
+    assert record.content_hash() == record._replace(employer_name='Другое название').content_hash()
+    assert record.content_hash() == record._replace(salary_from=150000.0).content_hash()
+    assert record.content_hash() != record._replace(title='Старший разработчик').content_hash()
+
+
+def test_json_decoder(monkeypatch):
+    monkeypatch.setattr(vacancy_record, 'msgspec', None)
+    found, records = decode_vacancies_page(PAGE)
+    assert found == 3
+    assert records == [VacancyRecord.from_dict(vacancy) for vacancy in VACANCIES]
+
+
+def test_msgspec_decoder_matches_json_decoder(monkeypatch):
+    pytest.importorskip('msgspec')
+    found, records = decode_vacancies_page(PAGE)
+    monkeypatch.setattr(vacancy_record, 'msgspec', None)
+    json_found, json_records = decode_vacancies_page(PAGE)
+    assert found == json_found
+    assert records == json_records
+    assert [record.content_hash() for record in records] == [record.content_hash() for record in json_records]
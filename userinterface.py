@@ -1,5 +1,53 @@
+from datetime import date
+
+from exporter import VacancyExporter
+from salary_analytics import SalaryAnalytics
+
 
 class UserInterface:
+    @staticmethod
+    def get_search_mode() -> str:
+        """
+        Получает от пользователя способ поиска работодателей.
+
+        Returns:
+            str: 'name' - поиск компаний по названию, 'industry' - обход всех работодателей отраслей.
+        """
+        while True:
+            print("\nКак будем искать работодателей?")
+            print("1. По названию компании")
+            print("2. Все работодатели выбранных отраслей")
+            choice = input("Введите свой выбор: ").strip()
+            if choice == '1':
+                return 'name'
+            if choice == '2':
+                return 'industry'
+            print("Некорректный выбор. Попробуйте снова.")
+
+    @staticmethod
+    def get_industry_ids(industry_groups: list, industries: list) -> list[str]:
+        """
+        Получает от пользователя ID отраслей для обхода.
+
+        Args:
+            industry_groups (list): Группы отраслей (ID, название) из industries.json.
+            industries (list): Отрасли (ID, название), загруженные в таблицу industries.
+
+        Returns:
+            list[str]: Список ID отраслей, введенных пользователем.
+        """
+        known_ids = {industry_id for industry_id, _ in industry_groups} | {industry_id for industry_id, _ in industries}
+        print("Группы отраслей:")
+        for industry_id, name in industry_groups:
+            print(f"{industry_id}. {name}")
+        while True:
+            input_text = input("Введите ID групп отраслей или отраслей через запятую (например, 7 или 7.540): ")
+            industry_ids = [industry_id.strip() for industry_id in input_text.split(',')
+                            if industry_id.strip() in known_ids]
+            if industry_ids:
+                return industry_ids
+            print("Некорректные ID отраслей.")
+
     @staticmethod
     def get_company_names() -> list[str]:
         """
@@ -60,7 +108,12 @@ class UserInterface:
             print("3. Показать среднюю зарплату")
             print("4. Показать вакансии с более высокой зарплатой")
             print("5. Поиск вакансий по ключевому слову")
-            print("6. Отдыхать...")
+            print("6. Выгрузить вакансии в файл (CSV/Parquet)")
+            print("7. Распределение зарплат по регионам")
+            print("8. Распределение зарплат по отраслям")
+            print("9. Динамика зарплат по месяцам")
+            print("10. Гистограмма зарплат")
+            print("11. Отдыхать...")
 
             choice = input("Введите свой выбор: ")
 
@@ -76,6 +129,16 @@ class UserInterface:
                 keyword = input("Введите ключевое слово для поиска(поиск ведется в названии вакансий): ").lower().strip()
                 UserInterface.show_vacancies_with_keyword(db_manager, keyword)
             elif choice == '6':
+                UserInterface.export_vacancies(db_manager)
+            elif choice == '7':
+                UserInterface.show_salary_distribution(db_manager, 'region_id', "Регион")
+            elif choice == '8':
+                UserInterface.show_salary_distribution(db_manager, 'industry_id', "Отрасль")
+            elif choice == '9':
+                UserInterface.show_salary_distribution(db_manager, 'month', "Месяц")
+            elif choice == '10':
+                UserInterface.show_salary_histogram(db_manager)
+            elif choice == '11':
                 print("Выход из программы.")
                 break
             else:
@@ -175,3 +238,123 @@ class UserInterface:
                 print(vacancy)
         else:
             print(f"Нет вакансий с ключевым словом '{keyword}'.")
+
+    @staticmethod
+    def _parse_ids(input_text: str) -> list[int]:
+        """
+        Разбирает список идентификаторов, введенных через запятую.
+
+        Args:
+            input_text (str): Введенная пользователем строка.
+
+        Returns:
+            list[int]: Список идентификаторов.
+        """
+        return [int(num.strip()) for num in input_text.split(',') if num.strip().isdigit()]
+
+    @staticmethod
+    def export_vacancies(db_manager) -> None:
+        """
+        Запрашивает у пользователя формат, путь к файлу и фильтры и выгружает вакансии в файл.
+
+        Args:
+            db_manager: Менеджер базы данных.
+
+        Returns:
+            None
+        """
+        file_format = input("Формат файла (csv/parquet, по умолчанию csv): ").strip().lower() or 'csv'
+        if file_format not in ('csv', 'parquet'):
+            print("Некорректный формат файла.")
+            return
+        file_path = input("Путь к файлу: ").strip() or f"vacancies.{file_format}"
+        employer_ids = UserInterface._parse_ids(input("ID работодателей через запятую (Enter - все): "))
+        region_ids = UserInterface._parse_ids(input("ID регионов через запятую (Enter - все): "))
+        try:
+            date_from = input("Дата публикации с (ГГГГ-ММ-ДД, Enter - без ограничения): ").strip()
+            date_to = input("Дата публикации по (ГГГГ-ММ-ДД, Enter - без ограничения): ").strip()
+            date_from = date.fromisoformat(date_from) if date_from else None
+            date_to = date.fromisoformat(date_to) if date_to else None
+        except ValueError:
+            print("Некорректная дата.")
+            return
+        VacancyExporter(db_manager).export(file_path, file_format, employer_ids=employer_ids,
+                                           region_ids=region_ids, date_from=date_from, date_to=date_to)
+
+    @staticmethod
+    def get_salary_filters(group_by: str = None) -> dict | None:
+        """
+        Запрашивает у пользователя фильтры аналитики зарплат: регион, отрасль и период по месяцам.
+        Фильтр по измерению, в разрезе которого строится распределение, не запрашивается.
+
+        Args:
+            group_by (str, optional): Измерение распределения: 'region_id', 'industry_id' или 'month'.
+
+        Returns:
+            dict | None: Фильтры region_id, industry_id, month_from, month_to или None при некорректном вводе.
+        """
+        filters = {}
+        try:
+            if group_by != 'region_id':
+                region_id = input("ID региона (Enter - все регионы): ").strip()
+                filters['region_id'] = int(region_id) if region_id else None
+            if group_by != 'industry_id':
+                industry_id = input("ID отрасли, например 7.540 (Enter - все отрасли): ").strip()
+                filters['industry_id'] = float(industry_id) if industry_id else None
+            if group_by != 'month':
+                month_from = input("Месяц с (ГГГГ-ММ, Enter - без ограничения): ").strip()
+                month_to = input("Месяц по (ГГГГ-ММ, Enter - без ограничения): ").strip()
+                filters['month_from'] = date.fromisoformat(f"{month_from}-01") if month_from else None
+                filters['month_to'] = date.fromisoformat(f"{month_to}-01") if month_to else None
+        except ValueError:
+            print("Некорректное значение фильтра.")
+            return None
+        return filters
+
+    @staticmethod
+    def show_salary_distribution(db_manager, group_by: str, title: str) -> None:
+        """
+        Отображает количество вакансий, среднюю зарплату и перцентили зарплат в разрезе измерения.
+
+        Args:
+            db_manager: Менеджер базы данных.
+            group_by (str): Измерение: 'region_id', 'industry_id' или 'month'.
+            title (str): Заголовок измерения для вывода.
+
+        Returns:
+            None
+        """
+        filters = UserInterface.get_salary_filters(group_by)
+        if filters is None:
+            return
+        distribution = SalaryAnalytics(db_manager).get_distribution(group_by, **filters)
+        if distribution:
+            print(f"{title}: вакансий, средняя, 25% / медиана / 75% / 90%")
+            for row in distribution:
+                print(f"{row['name']}: {row['count']}, {row['avg']} руб., "
+                      f"{row['p25']} / {row['p50']} / {row['p75']} / {row['p90']} руб.")
+        else:
+            print("Нет данных о зарплате.")
+
+    @staticmethod
+    def show_salary_histogram(db_manager) -> None:
+        """
+        Отображает гистограмму зарплат с учетом выбранных региона, отрасли и периода.
+
+        Args:
+            db_manager: Менеджер базы данных.
+
+        Returns:
+            None
+        """
+        filters = UserInterface.get_salary_filters()
+        if filters is None:
+            return
+        histogram = SalaryAnalytics(db_manager).get_histogram(**filters)
+        if not histogram:
+            print("Нет данных о зарплате.")
+            return
+        max_count = max(count for _, _, count in histogram)
+        for lower, upper, count in histogram:
+            label = f"{lower}-{upper}" if upper is not None else f"от {lower}"
+            print(f"{label:>16} руб. | {'#' * max(1, round(40 * count / max_count))} {count}")
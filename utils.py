@@ -1,21 +1,36 @@
-import json
+import re
 from typing import List, Dict, Optional
 import requests
-from bs4 import BeautifulSoup
 
+from http_transport import HttpTransport
 
-def get_regions_by_group(max_population) -> List[List[int]]:
+# Организационно-правовые формы, которые не учитываются при поиске работодателя по названию
+LEGAL_FORMS = {'ооо', 'оао', 'зао', 'пао', 'ао', 'ип', 'нко', 'фгуп', 'гуп', 'муп'}
+
+
+def get_regions_by_group(max_population, regions: List[Dict[str, str]],
+                         transport: Optional[HttpTransport] = None) -> List[List[int]]:
     """
     Получает список с группами регионов, сгруппированных по населению.
     Данная группировка позволяет обойти ограничение на глубину выдачи вакансий по запросу к hh.ru,
     так как существует ограничение в 2000 вакансий на один запрос. Путем разбиения на группы
     на основе населения, можно получить все вакансии по России. Эту группировку можно кастомизировать увеличивая или уменьшая константу MAX_POPULATION
+
+    Аргументы:
+        max_population: Предельное население группы регионов.
+        regions (List[Dict[str, str]]): Регионы верхнего уровня с ключами 'id' и 'name'.
+        transport (Optional[HttpTransport]): Общий HTTP-транспорт. Если не передан, создается новый.
+
     Возвращает:
         List[List[int]]: Список списков идентификаторов регионов, сгруппированных по населению.
     """
     url = "https://ru.wikipedia.org/wiki/%D0%9D%D0%B0%D1%81%D0%B5%D0%BB%D0%B5%D0%BD%D0%B8%D0%B5_%D1%81%D1%83%D0%B1%D1%8A%D0%B5%D0%BA%D1%82%D0%BE%D0%B2_%D0%A0%D0%BE%D1%81%D1%81%D0%B8%D0%B9%D1%81%D0%BA%D0%BE%D0%B9_%D0%A4%D0%B5%D0%B4%D0%B5%D1%80%D0%B0%D1%86%D0%B8%D0%B8"
 
-    response = requests.get(url)
+    # BeautifulSoup нужен только здесь, поэтому импортируется при первом вызове
+    from bs4 import BeautifulSoup
+
+    transport = transport or HttpTransport(requests.utils.default_user_agent())
+    response = transport.get(url)
     html_content = response.text
     soup = BeautifulSoup(html_content, "html.parser")
     table = soup.find("table", class_="standard sortable")
@@ -44,8 +59,6 @@ def get_regions_by_group(max_population) -> List[List[int]]:
             current_group += 1
             current_population = 0
 
-    with open('areas.json', 'r', encoding='utf-8') as areas_file:
-        areas_data = json.load(areas_file)
     regions_by_group = {}
 
     def find_region_id(data: List[Dict[str, str]], region_name: str) -> Optional[int]:
@@ -67,20 +80,21 @@ def get_regions_by_group(max_population) -> List[List[int]]:
     for group, subjects in grouped_data.items():
         region_ids = []
         for subject in subjects.keys():
-            region_id = find_region_id(areas_data['areas'], subject)
+            region_id = find_region_id(regions, subject)
             if region_id:
                 region_ids.append(int(region_id))
         regions_by_group[group] = region_ids
 
-    return regions_by_group.values()
+    return list(regions_by_group.values())
 
 
-def fetch_currency_data(user_agent: str) -> Dict[str, float]:
+def fetch_currency_data(user_agent: str, transport: Optional[HttpTransport] = None) -> Dict[str, float]:
     """
     Получает данные о валютах.
 
     Аргументы:
         user_agent (str): Заголовок User-Agent для запросов.
+        transport (Optional[HttpTransport]): Общий HTTP-транспорт. Если не передан, создается новый.
 
     Возвращает:
         Dict[str, float]: Словарь с кодами валют в качестве ключей и их курсами обмена в качестве значений.
@@ -88,12 +102,29 @@ def fetch_currency_data(user_agent: str) -> Dict[str, float]:
     params = {
         "locale": "RU"
     }
-    headers = {'User-Agent': user_agent}
+    transport = transport or HttpTransport(user_agent)
     url = f'https://api.hh.ru/dictionaries'
-    response = requests.get(url, headers=headers, params=params)
+    response = transport.get(url, params=params)
     currencies = {}
     if response.status_code == 200:
         response_data = response.json()
         for currency in response_data.get('currency', []):
             currencies[currency['code']] = currency['rate']
         return currencies
+
+
+
+def normalize_company_name(name: str) -> str:
+    """
+    Приводит название компании к нормализованному виду для поиска в справочнике работодателей:
+    нижний регистр, "ё" заменяется на "е", знаки препинания и организационно-правовые формы отбрасываются.
+
+    Аргументы:
+        name (str): Название компании.
+
+    Возвращает:
+        str: Нормализованное название компании.
+    """
+    name = name.lower().replace('ё', 'е')
+    words = re.sub(r'[^\w\s]', ' ', name).split()
+    return ' '.join(word for word in words if word not in LEGAL_FORMS)
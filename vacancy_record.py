@@ -0,0 +1,143 @@
+import hashlib
+import json
+from sys import intern
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class VacancyRecord(NamedTuple):
+    """
+    Компактная запись о вакансии: только поля, которые сохраняются в базу данных.
+    """
+    vacancy_id: int
+    title: str
+    city_id: int
+    salary_from: Optional[float]
+    salary_to: Optional[float]
+    currency: Optional[str]
+    gross: Optional[bool]
+    published_at: str
+    archived: bool
+    address: Optional[str]
+    employer_id: Optional[int]
+    employer_name: Optional[str]
+    url: str
+
+    def content_hash(self) -> str:
+        """
+        Вычисляет хеш содержимого вакансии для обнаружения изменений при повторной загрузке.
+        Название работодателя в хеш не входит, зарплата учитывается в исходной валюте.
+
+        Возвращает:
+            str: MD5-хеш в шестнадцатеричном виде.
+        """
+        content = (self.vacancy_id, self.title, self.city_id,
+                   float(self.salary_from) if self.salary_from is not None else None,
+                   float(self.salary_to) if self.salary_to is not None else None,
+                   self.currency, self.gross, self.published_at, self.archived, self.address,
+                   self.employer_id, self.url)
+        return hashlib.md5(repr(content).encode()).hexdigest()
+
+    @classmethod
+    def from_dict(cls, vacancy: Dict[str, Any]) -> 'VacancyRecord':
+        """
+        Создает запись из словаря вакансии в формате API hh.ru.
+
+        Аргументы:
+            vacancy (Dict[str, Any]): Данные о вакансии из ответа API.
+
+        Возвращает:
+            VacancyRecord: Запись о вакансии.
+        """
+        salary = vacancy.get('salary') or {}
+        address = vacancy.get('address') or {}
+        employer = vacancy.get('employer') or {}
+        return cls(int(vacancy['id']),
+                   vacancy['name'],
+                   int(vacancy['area']['id']),
+                   salary.get('from'),
+                   salary.get('to'),
+                   intern(salary['currency']) if salary.get('currency') else None,
+                   salary.get('gross'),
+                   vacancy['published_at'],
+                   bool(vacancy.get('archived')),
+                   address.get('raw'),
+                   int(employer['id']) if employer.get('id') else None,
+                   intern(employer['name']) if employer.get('name') else None,
+                   vacancy['alternate_url'])
+
+
+if msgspec is not None:
+    # Типизированное описание только нужной части ответа /vacancies: остальные поля декодер пропускает
+    class _Salary(msgspec.Struct):
+        from_: Optional[float] = msgspec.field(default=None, name='from')
+        to: Optional[float] = None
+        currency: Optional[str] = None
+        gross: Optional[bool] = None
+
+    class _Area(msgspec.Struct):
+        id: str
+
+    class _Address(msgspec.Struct):
+        raw: Optional[str] = None
+
+    class _Employer(msgspec.Struct):
+        id: Optional[str] = None
+        name: Optional[str] = None
+
+    class _Vacancy(msgspec.Struct):
+        id: str
+        name: str
+        area: _Area
+        published_at: str
+        alternate_url: str
+        archived: bool = False
+        salary: Optional[_Salary] = None
+        address: Optional[_Address] = None
+        employer: Optional[_Employer] = None
+
+    class _VacanciesPage(msgspec.Struct):
+        found: int = 0
+        items: List[_Vacancy] = msgspec.field(default_factory=list)
+
+    _page_decoder = msgspec.json.Decoder(_VacanciesPage)
+
+    def _record_from_struct(vacancy: '_Vacancy') -> VacancyRecord:
+        salary = vacancy.salary
+        employer = vacancy.employer
+        return VacancyRecord(int(vacancy.id),
+                             vacancy.name,
+                             int(vacancy.area.id),
+                             salary.from_ if salary else None,
+                             salary.to if salary else None,
+                             intern(salary.currency) if salary and salary.currency else None,
+                             salary.gross if salary else None,
+                             vacancy.published_at,
+                             vacancy.archived,
+                             vacancy.address.raw if vacancy.address else None,
+                             int(employer.id) if employer and employer.id else None,
+                             intern(employer.name) if employer and employer.name else None,
+                             vacancy.alternate_url)
+
+
+def decode_vacancies_page(content: bytes) -> Tuple[int, List[VacancyRecord]]:
+    """
+    Декодирует страницу ответа /vacancies сразу в компактные записи о вакансиях.
+    Если установлен пакет msgspec, используется типизированный декодер, который не создает
+    объекты для неиспользуемых полей; иначе ответ разбирается стандартным модулем json.
+
+    Аргументы:
+        content (bytes): Тело ответа API.
+
+    Возвращает:
+        Tuple[int, List[VacancyRecord]]: Общее количество найденных вакансий и записи о вакансиях страницы.
+    """
+    if msgspec is not None:
+        page = _page_decoder.decode(content)
+        return page.found, [_record_from_struct(vacancy) for vacancy in page.items]
+    page = json.loads(content)
+    return page.get('found', 0), [VacancyRecord.from_dict(vacancy) for vacancy in page.get('items', [])]